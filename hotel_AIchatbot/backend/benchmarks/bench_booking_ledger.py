@@ -0,0 +1,73 @@
+"""BookingLedger throughput for concurrent confirmations, group commit against one commit per booking.
+
+Each confirmation awaits its own durable append, as /confirm does. max_batch=1 gives the
+one-fsync-per-booking baseline. Pass --dir to measure on the disk the ledger will live on, and
+--max-delay to try a booking_ledger_max_delay setting.
+
+Usage: python benchmarks/bench_booking_ledger.py [--bookings 2000] [--concurrency 1 16 64 256] [--max-delay 0] [--dir /tmp]
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helper.booking_ledger import BookingLedger
+
+def booking(index):
+    """A confirmation shaped like confirm_booking's booking_details"""
+    return {
+        "hotel_name": f"Hotel {index % 28}",
+        "check_in": "2030-05-20",
+        "check_out": "2030-05-25",
+        "num_guests": 2,
+        "guest_names": ["John Doe", "Jane Doe"],
+        "phone": "123-456-7890",
+        "total_price": 10350.0,
+    }
+
+async def confirm_all(ledger, total, concurrency):
+    """Append total bookings from concurrency clients, each waiting for its previous append"""
+    async def client(start):
+        for index in range(start, total, concurrency):
+            await ledger.append(booking(index))
+
+    await asyncio.gather(*(client(start) for start in range(concurrency)))
+
+def run(directory, total, concurrency, max_batch, max_delay):
+    """Bookings per second and the ledger stats for one configuration"""
+    with tempfile.TemporaryDirectory(dir=directory) as scratch:
+        ledger = BookingLedger(os.path.join(scratch, "bookings.db"), max_batch=max_batch, max_delay=max_delay)
+        start = time.perf_counter()
+        asyncio.run(confirm_all(ledger, total, concurrency))
+        elapsed = time.perf_counter() - start
+        ledger.close()
+
+        replay_start = time.perf_counter()
+        replayed = sum(1 for _ in BookingLedger(os.path.join(scratch, "bookings.db")).replay())
+        assert replayed == total
+        return total / elapsed, ledger.get_stats(), time.perf_counter() - replay_start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bookings", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64, 256])
+    parser.add_argument("--max-delay", type=float, default=0.0, help="seconds the writer waits to fill a batch")
+    parser.add_argument("--dir", default=None, help="directory for the scratch ledgers")
+    args = parser.parse_args()
+
+    print(f"{args.bookings} confirmations per run, group commit max_delay {args.max_delay * 1000:g} ms")
+    print(f"{'clients':>8} {'per-booking (bk/s)':>19} {'group (bk/s)':>13} {'avg batch':>10} {'speedup':>9} {'replay (ms)':>12}")
+    for concurrency in args.concurrency:
+        single_rate, _, _ = run(args.dir, args.bookings, concurrency, max_batch=1, max_delay=0.0)
+        group_rate, stats, replay_seconds = run(args.dir, args.bookings, concurrency, max_batch=256, max_delay=args.max_delay)
+        print(
+            f"{concurrency:>8} {single_rate:>19.0f} {group_rate:>13.0f} {stats['avg_batch_size']:>10.1f}"
+            f" {group_rate / single_rate:>8.1f}x {replay_seconds * 1000:>12.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""DateParser.find message throughput against the per-pattern re.search check it replaced.
+
+The old check only answered whether a message looked like it had a date; DateParser.find also
+parses the date range, so it does more work per message.
+
+Usage: python benchmarks/bench_date_parser.py [--messages 10000]
+"""
+import os
+import re
+import sys
+import random
+import argparse
+import timeit
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helper.config import load_config
+from helper.date_parser import DateParser
+
+# BookingService's hard-coded patterns before date_pattern was used
+OLD_DATE_PATTERNS = [
+    r'\b(january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2}',
+    r'\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}',
+    r'\b\d{4}-\d{2}-\d{2}',
+]
+
+WITH_DATES = [
+    "I need a hotel in Dwarka from May 20 to May 25",
+    "Looking for a room in Jaipur 20th to 25th June for two adults",
+    "Can you book something in Gujarat from 2030-05-20 to 2030-05-25?",
+    "We arrive 20/05/2030 to 25/05/2030, somewhere near the beach please",
+    "2030-05-20",
+]
+WITHOUT_DATES = [
+    "Hello, can you help me find a hotel?",
+    "Which of these hotels has a swimming pool and free breakfast for the kids?",
+    "Hotel Gopal",
+    "John Doe",
+    "Do you have anything cheaper in the old city, maybe with parking included as well?",
+]
+
+def old_has_dates(message):
+    """The old path: one uncompiled re.search per pattern over the lowercased message"""
+    return any(re.search(pattern, message.lower()) for pattern in OLD_DATE_PATTERNS)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=10_000)
+    args = parser.parse_args()
+
+    date_parser = DateParser(load_config()["date_pattern"])
+    today = date(2030, 1, 1)
+    rng = random.Random(7)
+    assert all(date_parser.find(message, today) for message in WITH_DATES)
+    assert not any(date_parser.find(message, today) for message in WITHOUT_DATES)
+    print(f"{'messages':<22} {'old check (msg/s)':>18} {'DateParser.find (msg/s)':>24} {'ratio':>7}")
+    for label, pool in [("with dates", WITH_DATES), ("without dates", WITHOUT_DATES), ("mixed", WITH_DATES + WITHOUT_DATES)]:
+        messages = [rng.choice(pool) for _ in range(args.messages)]
+
+        old_seconds = min(timeit.repeat(lambda: [old_has_dates(message) for message in messages], number=1, repeat=5))
+        new_seconds = min(timeit.repeat(lambda: [date_parser.find(message, today) for message in messages], number=1, repeat=5))
+        print(f"{label:<22} {len(messages) / old_seconds:>18,.0f} {len(messages) / new_seconds:>24,.0f} {old_seconds / new_seconds:>6.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Vectorized HotelColumns queries against the list-comprehension path they replaced.
+
+Usage: python benchmarks/bench_hotel_columns.py [--sizes 10000 100000 1000000]
+"""
+import os
+import sys
+import random
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helper.hotel_columns import HotelColumns
+
+STATES = {
+    "Gujarat": ["Dwarka", "Ahmedabad", "Vadodara", "Rajkot", "Surat"],
+    "Rajasthan": ["Jaipur", "Udaipur"],
+    "Maharashtra": ["Mumbai", "Pune"],
+    "Uttar Pradesh": ["Mathura", "Lucknow", "Vrindavan"],
+}
+
+def make_hotels(count, seed=7):
+    """Synthetic catalog shaped like hotel.json"""
+    rng = random.Random(seed)
+    places = [(city, state) for state, cities in STATES.items() for city in cities]
+    hotels = []
+    for index in range(count):
+        city, state = rng.choice(places)
+        hotels.append({
+            "hotel_name": f"Hotel {index}",
+            "location": f"{city}, {state}",
+            "price_per_night": rng.randrange(50, 6000),
+            "number_of_guests": rng.randrange(1, 6),
+        })
+    return hotels
+
+def list_query(hotels, location, max_price, min_guests):
+    """The old path: a Python loop over the hotel dicts, then a sort"""
+    location = location.lower()
+    matches = [
+        hotel_id for hotel_id, hotel in enumerate(hotels)
+        if location in hotel["location"].lower()
+        and hotel["price_per_night"] <= max_price and hotel["number_of_guests"] >= min_guests
+    ]
+    return sorted(matches, key=lambda hotel_id: hotels[hotel_id]["price_per_night"])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print("query: hotels in Gujarat, <= $200/night, >= 3 guests, sorted by price")
+    print(f"{'hotels':>10} {'list (ms)':>12} {'columns (ms)':>14} {'speedup':>9}")
+    for size in args.sizes:
+        hotels = make_hotels(size)
+        columns = HotelColumns(hotels)
+        expected = list_query(hotels, "Gujarat", 200, 3)
+        # Ties in price keep catalog order in both paths
+        assert columns.query(location="Gujarat", max_price=200, min_guests=3, sort="price_per_night").tolist() == expected
+
+        runs = max(3, 2_000_000 // size)
+        list_ms = min(timeit.repeat(lambda: list_query(hotels, "Gujarat", 200, 3), number=1, repeat=runs)) * 1000
+        columns_ms = min(timeit.repeat(
+            lambda: columns.query(location="Gujarat", max_price=200, min_guests=3, sort="price_per_night"),
+            number=1, repeat=runs
+        )) * 1000
+        print(f"{size:>10} {list_ms:>12.2f} {columns_ms:>14.2f} {list_ms / columns_ms:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""RoomInventory overlap checks with millions of stored bookings, against a per-hotel list of stays.
+
+Usage: python benchmarks/bench_inventory.py [--hotels 2000] [--bookings 2000000]
+"""
+import os
+import sys
+import random
+import argparse
+import timeit
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helper.inventory import RoomInventory
+
+FIRST_NIGHT = date(2026, 1, 1)
+
+def make_stays(hotels, bookings, seed=7):
+    """Back-to-back stays of one to four nights with short gaps, spread evenly over the hotels"""
+    rng = random.Random(seed)
+    stays = {}
+    per_hotel = bookings // hotels
+    for index in range(hotels):
+        day = FIRST_NIGHT + timedelta(days=rng.randrange(30))
+        hotel_stays = stays[f"Hotel {index}"] = []
+        for _ in range(per_hotel):
+            check_out = day + timedelta(days=rng.randrange(1, 5))
+            hotel_stays.append((day, check_out))
+            day = check_out + timedelta(days=rng.randrange(3))
+    return stays
+
+def list_is_available(stays, hotel_name, check_in, check_out):
+    """Baseline: scan every stored stay of the hotel for an overlap"""
+    return all(check_out <= start or end <= check_in for start, end in stays.get(hotel_name, ()))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hotels", type=int, default=2000)
+    parser.add_argument("--bookings", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    stays = make_stays(args.hotels, args.bookings)
+    inventory = RoomInventory()
+    start = timeit.default_timer()
+    for hotel_name, hotel_stays in stays.items():
+        for check_in, check_out in hotel_stays:
+            assert inventory.reserve(hotel_name, check_in, check_out)
+    load_seconds = timeit.default_timer() - start
+    stats = inventory.get_stats()
+    print(f"{stats['bookings']} bookings over {stats['hotels_with_bookings']} hotels, loaded in {load_seconds:.1f}s"
+          f" ({load_seconds / stats['bookings'] * 1e6:.1f} us per reserve)")
+
+    rng = random.Random(11)
+    span = max(end for hotel_stays in stays.values() for _, end in hotel_stays[-1:]) - FIRST_NIGHT
+    queries = []
+    for _ in range(1000):
+        check_in = FIRST_NIGHT + timedelta(days=rng.randrange(span.days))
+        queries.append((f"Hotel {rng.randrange(args.hotels)}", check_in, check_in + timedelta(days=rng.randrange(1, 8))))
+    for query in queries[:100]:
+        assert inventory.is_available(*query) == list_is_available(stays, *query)
+
+    def per_check_us(check, runs):
+        seconds = min(timeit.repeat(lambda: [check(*query) for query in queries], number=runs, repeat=3))
+        return seconds / runs / len(queries) * 1_000_000
+
+    bitmap_us = per_check_us(inventory.is_available, 10)
+    list_us = per_check_us(lambda *query: list_is_available(stays, *query), 1)
+    print(f"{'':<26} {'bitmap':>12} {'stay list':>15}")
+    print(f"{'is_available (us)':<26} {bitmap_us:>12.2f} {list_us:>15.1f}")
+
+    # Listing filters every hotel of a location for the requested stay
+    hotels = [{"hotel_name": hotel_name} for hotel_name in stays]
+    _, check_in, check_out = queries[0]
+    keep = inventory.availability_filter(check_in, check_out)
+    filter_ms = min(timeit.repeat(lambda: [hotel for hotel in hotels if keep(hotel)], number=1, repeat=5)) * 1000
+    list_filter_ms = min(timeit.repeat(
+        lambda: [hotel for hotel in hotels if list_is_available(stays, hotel["hotel_name"], check_in, check_out)],
+        number=1, repeat=1
+    )) * 1000
+    print(f"{f'filter {len(hotels)} hotels (ms)':<26} {filter_ms:>12.2f} {list_filter_ms:>15.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""LocationMatcher.find against the per-keyword substring loop it replaced, as the catalog grows.
+
+Usage: python benchmarks/bench_location_matcher.py [--sizes 1000 10000 100000]
+"""
+import os
+import sys
+import random
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helper.location_matcher import LocationMatcher
+
+STATES = ["Gujarat", "Rajasthan", "Maharashtra", "Uttar Pradesh", "Kerala", "Goa", "Punjab", "Karnataka"]
+
+MESSAGES = [
+    "Hi, I need a hotel in {city} from 2030-05-20 to 2030-05-25 for two people",
+    "Can you show me something cheap near the station, we arrive next Friday",
+    "We are a family of four travelling to {city}, {state} for a wedding",
+]
+
+def make_hotels(count, seed=7):
+    """Synthetic catalog shaped like hotel.json, with one city per 20 hotels"""
+    rng = random.Random(seed)
+    cities = [(f"Town{index}", rng.choice(STATES)) for index in range(max(1, count // 20))]
+    return [{"location": "{}, {}".format(*rng.choice(cities))} for _ in range(count)], cities
+
+def available_locations(hotels):
+    """City and state keywords, as functions.get_available_locations builds them"""
+    keywords = set()
+    for hotel in hotels:
+        for part in hotel["location"].lower().split(","):
+            if part.strip():
+                keywords.add(part.strip())
+    return list(keywords)
+
+def loop_find(keywords, message):
+    """The old path: one substring search per keyword, first hit in keyword order wins"""
+    message = message.lower()
+    for keyword in keywords:
+        if keyword in message:
+            return keyword
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    print("per-message cost over a mix of messages with and without a location")
+    print(f"{'hotels':>8} {'keywords':>9} {'build (ms)':>11} {'loop (us)':>10} {'rebuild+loop (us)':>18} {'matcher (us)':>13}")
+    for size in args.sizes:
+        hotels, cities = make_hotels(size)
+        city, state = cities[len(cities) // 2]
+        messages = [message.format(city=city, state=state) for message in MESSAGES]
+
+        build_ms = min(timeit.repeat(lambda: LocationMatcher(available_locations(hotels)), number=1, repeat=3)) * 1000
+        keywords = available_locations(hotels)
+        matcher = LocationMatcher(keywords)
+        assert matcher.find(messages[0]) == city.lower()
+
+        def per_message_us(find, runs):
+            seconds = min(timeit.repeat(lambda: [find(message) for message in messages], number=runs, repeat=3))
+            return seconds / runs / len(messages) * 1_000_000
+
+        runs = max(10, 1_000_000 // size)
+        loop_us = per_message_us(lambda message: loop_find(keywords, message), runs)
+        # The legacy functions.extract_location_from_message also rebuilt the keywords on every call
+        rebuild_us = per_message_us(lambda message: loop_find(available_locations(hotels), message), max(1, runs // 100))
+        matcher_us = per_message_us(matcher.find, runs * 10)
+        print(f"{size:>8} {len(keywords):>9} {build_ms:>11.1f} {loop_us:>10.1f} {rebuild_us:>18.1f} {matcher_us:>13.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Pooled async OllamaService.chat against the blocking requests.post call it replaced.
+
+Starts a stub Ollama server on localhost that answers /api/chat after a fixed delay, then
+sends the same number of chat calls from an increasing number of concurrent sessions.
+
+Usage: python benchmarks/bench_ollama_client.py [--latency 0.05] [--requests 256] [--concurrency 1 8 32 128]
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helper.ollama_service import OllamaService
+
+REPLY = json.dumps({"message": {"role": "assistant", "content": "Happy to help with your booking!"}}).encode()
+MESSAGES = [{"role": "user", "content": "I need a hotel in Dwarka"}]
+
+async def start_stub(latency):
+    """Minimal keep-alive HTTP/1.1 server that answers every request like Ollama's /api/chat"""
+    async def handle(reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                await reader.readexactly(length)
+                await asyncio.sleep(latency)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(REPLY)).encode() + b"\r\n\r\n" + REPLY
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+def blocking_chat(host):
+    """The old path: a fresh blocking requests.post from inside the async handler"""
+    response = requests.post(f"{host}/api/chat", json={"model": "stub", "messages": MESSAGES, "stream": False})
+    response.raise_for_status()
+    return response.json()["message"]["content"].strip()
+
+async def run_sessions(call, total, concurrency):
+    """Issue total calls from concurrency sessions, each waiting for its previous reply; returns seconds"""
+    async def session(count):
+        for _ in range(count):
+            await call()
+
+    start = time.perf_counter()
+    share, extra = divmod(total, concurrency)
+    await asyncio.gather(*(session(share + (index < extra)) for index in range(concurrency)))
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.05, help="stub generation time in seconds")
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    args = parser.parse_args()
+
+    # The stub runs on its own loop in a thread, so the blocking client cannot stall it
+    stub_loop = asyncio.new_event_loop()
+    server, port = stub_loop.run_until_complete(start_stub(args.latency))
+    threading.Thread(target=stub_loop.run_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{port}"
+
+    async def bench():
+        service = OllamaService({"ollama_host": host, "ollama_model": "stub", "ollama_max_connections": max(args.concurrency)})
+
+        async def blocking():
+            blocking_chat(host)
+
+        async def pooled():
+            await service.chat(MESSAGES)
+
+        print(f"{args.requests} chat calls, stub latency {args.latency * 1000:.0f} ms")
+        print(f"{'sessions':>9} {'blocking (req/s)':>17} {'pooled (req/s)':>15} {'speedup':>9}")
+        for concurrency in args.concurrency:
+            blocking_seconds = await run_sessions(blocking, args.requests, concurrency)
+            pooled_seconds = await run_sessions(pooled, args.requests, concurrency)
+            print(
+                f"{concurrency:>9} {args.requests / blocking_seconds:>17.1f} {args.requests / pooled_seconds:>15.1f}"
+                f" {blocking_seconds / pooled_seconds:>8.1f}x"
+            )
+        await service.close()
+
+    asyncio.run(bench())
+    stub_loop.call_soon_threadsafe(server.close)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""QuoteEngine totals for every hotel of a location against a per-hotel Python pricing loop.
+
+Usage: python benchmarks/bench_quote_engine.py [--sizes 10000 100000 1000000]
+"""
+import os
+import sys
+import argparse
+import timeit
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_hotel_columns import make_hotels
+from helper.hotel_service import HotelCatalog
+from helper.pricing import PricingRules, QuoteEngine
+
+CHECK_IN, CHECK_OUT = "2030-05-20", "2030-05-25"
+
+def loop_quote(catalog, hotel_ids, rules, nights):
+    """The old path: confirm_booking's price math run once per hotel"""
+    totals = []
+    for hotel_id in hotel_ids:
+        subtotal = catalog.hotels[hotel_id]["price_per_night"] * nights
+        totals.append(subtotal + round(subtotal * rules.tax_rate, 2))
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"quote: every hotel in Gujarat, {CHECK_IN} to {CHECK_OUT}")
+    print(f"{'hotels':>10} {'quoted':>8} {'loop (ms)':>10} {'quote_ids (ms)':>15} {'speedup':>9} {'top 50 (ms)':>12}")
+    for size in args.sizes:
+        hotels = make_hotels(size)
+        catalog = HotelCatalog(hotels)
+        # A few per-night overrides, as config.json's pricing section would add
+        rules = PricingRules({"pricing": {"nightly_overrides": {
+            hotels[index]["hotel_name"]: {"2030-05-21": 99, "2030-05-22": 99} for index in range(0, size, size // 5)
+        }}})
+        engine = QuoteEngine(SimpleNamespace(catalog=catalog), rules)
+        hotel_ids = catalog.get_hotel_ids_by_location("gujarat")
+
+        rules_without_overrides = PricingRules({})
+        plain = QuoteEngine(SimpleNamespace(catalog=catalog), rules_without_overrides)
+        assert plain.quote_ids(catalog, hotel_ids, CHECK_IN, CHECK_OUT)["total"].tolist() == \
+            loop_quote(catalog, hotel_ids, rules_without_overrides, 5)
+
+        runs = max(3, 1_000_000 // size)
+        loop_ms = min(timeit.repeat(lambda: loop_quote(catalog, hotel_ids, rules, 5), number=1, repeat=runs)) * 1000
+        quote_ms = min(timeit.repeat(
+            lambda: engine.quote_ids(catalog, hotel_ids, CHECK_IN, CHECK_OUT), number=1, repeat=runs
+        )) * 1000
+        # The /quote endpoint also sorts by total and builds one page of results
+        page_ms = min(timeit.repeat(
+            lambda: engine.quote(CHECK_IN, CHECK_OUT, location="Gujarat"), number=1, repeat=runs
+        )) * 1000
+        print(f"{size:>10} {len(hotel_ids):>8} {loop_ms:>10.2f} {quote_ms:>15.2f} {loop_ms / quote_ms:>8.1f}x {page_ms:>12.2f}")
+
+if __name__ == "__main__":
+    main()
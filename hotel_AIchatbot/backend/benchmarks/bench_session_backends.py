@@ -0,0 +1,124 @@
+"""Chat booking throughput of the single API worker with the memory and sqlite session backends.
+
+Imports main.py in a scratch directory with a stub Ollama, then walks many sessions through the
+full chat booking flow at once and checks that every booking was completed exactly once.
+The API still runs as one process, so this measures what persisting sessions to SQLite costs
+that process; it says nothing about scaling across workers.
+
+Usage: python benchmarks/bench_session_backends.py [--sessions 200] [--concurrency 1 16 64] [--latency 0.02]
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import contextlib
+import importlib
+import tempfile
+from datetime import date, timedelta
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from helper import config as config_module
+
+def ollama_transport(latency):
+    """httpx transport answering /api/chat like Ollama after a fixed generation delay"""
+    async def handler(request):
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json={"message": {"content": "Happy to help with your booking!"}})
+    return httpx.MockTransport(handler)
+
+def load_app(scratch, backend, latency):
+    """Import main.py inside scratch with the given session backend, without TTS work or background pollers"""
+    os.makedirs(os.path.join(scratch, "json"))
+    os.makedirs(os.path.join(scratch, "static"))
+    shutil.copy(os.path.join(BACKEND_DIR, "json", "hotel.json"), os.path.join(scratch, "json", "hotel.json"))
+    os.chdir(scratch)
+    config = {
+        **config_module.load_config(),
+        "ollama_host": "http://ollama.stub",
+        "tts_engine": "silent",
+        # Audio is rendered only when fetched, so the run measures the chat path alone
+        "audio_mode": "lazy",
+        "hotel_reload_interval": 0,
+        "session_sweep_interval": 0,
+        "session_backend": backend,
+    }
+    config_module.load_config = lambda: config
+    sys.modules.pop("main", None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        main = importlib.import_module("main")
+    main.ollama_service._client = httpx.AsyncClient(base_url=config["ollama_host"], transport=ollama_transport(latency))
+    return main
+
+def booking_messages(index):
+    """The chat turns of one booking; every session books Hotel Gopal for its own week"""
+    check_in = date(2030, 1, 1) + timedelta(weeks=index)
+    check_in, check_out = check_in.isoformat(), (check_in + timedelta(days=5)).isoformat()
+    return [
+        "hello",
+        f"I need a hotel in Dwarka from {check_in} to {check_out}",
+        "Hotel Gopal",
+        check_in,
+        check_out,
+        "1",
+        "John Doe",
+        "123-456-7890",
+    ]
+
+async def run_flows(main, sessions, concurrency):
+    """Book every session through /chat, concurrency sessions at a time; returns (seconds, final replies)"""
+    transport = httpx.ASGITransport(app=main.app)
+    gate = asyncio.Semaphore(concurrency)
+    await main.startup()
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+            async def flow(index):
+                async with gate:
+                    for message in booking_messages(index):
+                        response = await client.post(f"/chat/s{index}", json={"message": message})
+                        response.raise_for_status()
+                    return response.json()
+
+            start = time.perf_counter()
+            replies = await asyncio.gather(*(flow(index) for index in range(sessions)))
+            return time.perf_counter() - start, replies
+    finally:
+        await main.shutdown()
+
+def run(backend, sessions, concurrency, latency):
+    """Messages per second for one backend, after checking every booking completed"""
+    cwd = os.getcwd()
+    load_config = config_module.load_config
+    with tempfile.TemporaryDirectory() as scratch:
+        try:
+            main = load_app(scratch, backend, latency)
+            seconds, replies = asyncio.run(run_flows(main, sessions, concurrency))
+            assert all(reply["step"] == "completed" for reply in replies), json.dumps(replies[0])[:300]
+            assert main.inventory.get_stats()["bookings"] == sessions
+        finally:
+            os.chdir(cwd)
+            config_module.load_config = load_config
+    return sessions * len(booking_messages(0)) / seconds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--latency", type=float, default=0.02, help="stub LLM generation time in seconds")
+    args = parser.parse_args()
+
+    print(f"{args.sessions} chat bookings of {len(booking_messages(0))} messages, stub LLM latency {args.latency * 1000:.0f} ms")
+    print(f"{'sessions at once':>17} {'memory (msg/s)':>15} {'sqlite (msg/s)':>15} {'sqlite cost':>12}")
+    for concurrency in args.concurrency:
+        memory = run("memory", args.sessions, concurrency, args.latency)
+        sqlite = run("sqlite", args.sessions, concurrency, args.latency)
+        print(f"{concurrency:>17} {memory:>15.0f} {sqlite:>15.0f} {1 - sqlite / memory:>11.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Bytes per session for SessionState records against the dict-per-session layout they replaced.
+
+Every session is mid-booking: six chat turns, a selected hotel, dates, guests and one guest name.
+Message text is created up front and shared by both layouts, so the numbers compare the
+per-session structure around it; the text itself is reported separately.
+
+Usage: python benchmarks/bench_session_memory.py [--sessions 100000]
+"""
+import os
+import sys
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helper.session_manager import SYSTEM_PROMPT, SessionState
+
+HOTEL = {"hotel_name": "Hotel Gopal", "location": "Dwarka, Gujarat", "price_per_night": 1800, "number_of_guests": 3}
+
+def make_turns(index):
+    """Chat turns of one session, with text unique to the session"""
+    return [
+        ("user", f"I need a hotel in Dwarka from 2030-05-20 to 2030-05-25 (guest {index})"),
+        ("assistant", f"Fantastic! Here are some available hotel options for you, guest {index}."),
+        ("user", "Hotel Gopal"),
+        ("assistant", f"Great choice, guest {index}! What is your check-in date?"),
+        ("user", "2030-05-20"),
+        ("assistant", f"Check-in set for guest {index}. What is your check-out date?"),
+    ]
+
+def dict_session(turns):
+    """The old layout: a conversation list of role/content dicts plus an eleven-key data dict"""
+    conversation = [{"role": "system", "content": SYSTEM_PROMPT}]
+    conversation.extend({"role": role, "content": content} for role, content in turns)
+    data = {
+        "selected_hotel": HOTEL["hotel_name"],
+        "selected_hotel_details": HOTEL,
+        "check_in": "2030-05-20",
+        "check_out": "2030-05-25",
+        "num_guests": 2,
+        "guest_names": ["John Doe"],
+        "phone": None,
+        "current_step": "guest_names",
+        "user_location": "Dwarka",
+        "user_dates": ["2030-05-20", "2030-05-25"],
+        "image_sent": False,
+    }
+    return conversation, data
+
+def slotted_session(turns):
+    """The current layout: one SessionState with history as tuples and the hotel referenced by name"""
+    return SessionState(
+        history=[(role, content) for role, content in turns],
+        current_step="guest_names",
+        user_location="Dwarka",
+        user_dates=["2030-05-20", "2030-05-25"],
+        selected_hotel=HOTEL["hotel_name"],
+        check_in="2030-05-20",
+        check_out="2030-05-25",
+        num_guests=2,
+        guest_names=["John Doe"],
+    )
+
+def measure(build, all_turns):
+    """Bytes allocated per session while building one session per entry of all_turns"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = {f"session-{index}": build(turns) for index, turns in enumerate(all_turns)}
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    assert len(sessions) == len(all_turns)
+    return allocated / len(all_turns)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100_000)
+    args = parser.parse_args()
+
+    # Build the text outside the measurements; each layout builds its own message records around it
+    all_turns = [make_turns(index) for index in range(args.sessions)]
+    text_bytes = sum(sys.getsizeof(content) for turns in all_turns for _, content in turns) / args.sessions
+
+    dict_bytes = measure(dict_session, all_turns)
+    slotted_bytes = measure(slotted_session, all_turns)
+    print(f"{args.sessions} mid-booking sessions, {text_bytes:.0f} bytes of message text each (not counted below)")
+    print(f"{'layout':<16} {'bytes/session':>14} {'total (MB)':>11}")
+    print(f"{'dicts':<16} {dict_bytes:>14.0f} {dict_bytes * args.sessions / 1e6:>11.1f}")
+    print(f"{'SessionState':<16} {slotted_bytes:>14.0f} {slotted_bytes * args.sessions / 1e6:>11.1f}")
+    print(f"saved {1 - slotted_bytes / dict_bytes:.0%} of the per-session structure")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Session snapshot write, event-loop stall and warm-restore time at 100k sessions.
+
+Fills a SessionManager with mid-booking sessions, takes a full snapshot while a ticker task
+records how long the event loop is held, writes a small delta, then restores everything into a
+fresh SessionManager and checks it matches.
+
+Usage: python benchmarks/bench_session_snapshot.py [--sessions 100000] [--dir /tmp]
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helper.session_manager import SessionManager
+from helper.session_snapshot import SessionSnapshotter
+
+def fill(manager, sessions):
+    """Give every session two chat turns and a selected hotel"""
+    for index in range(sessions):
+        session_id = f"session-{index}"
+        manager.add_message(session_id, "user", f"I need a hotel in Dwarka from 2030-05-20 to 2030-05-25 (guest {index})")
+        manager.add_message(session_id, "assistant", f"Great choice, guest {index}! What is your check-in date?")
+        manager.update_session_data(session_id, "selected_hotel", "Hotel Gopal")
+        manager.update_session_data(session_id, "check_in", "2030-05-20")
+
+async def snapshot_with_ticker(snapshotter):
+    """Take one snapshot; returns the longest gap seen by a task that wakes every millisecond"""
+    gaps = []
+
+    async def ticker():
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            gaps.append(time.perf_counter() - start)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    await snapshotter.snapshot()
+    task.cancel()
+    return max(gaps)
+
+async def bench(directory, sessions):
+    config = {
+        "session_max_count": sessions * 2,
+        "session_snapshot_path": os.path.join(directory, "sessions.snapshot"),
+        "session_snapshot_compact_bytes": 1 << 40,
+    }
+    manager = SessionManager(config)
+    snapshotter = SessionSnapshotter(manager, config)
+    snapshotter.restore()
+    fill(manager, sessions)
+
+    stall = await snapshot_with_ticker(snapshotter)
+    size = os.path.getsize(snapshotter.delta_path)
+    print(f"full snapshot    {snapshotter.last_snapshot_seconds:>8.3f} s  {size / 1e6:.1f} MB, longest loop stall {stall * 1000:.1f} ms")
+
+    changed = sessions // 100
+    for index in range(changed):
+        manager.add_message(f"session-{index}", "user", "2030-05-25")
+    await snapshotter.snapshot()
+    print(f"delta of {changed:<7} {snapshotter.last_snapshot_seconds:>8.3f} s")
+
+    snapshotter.compact_bytes = 0
+    await snapshotter.snapshot()
+    print(f"compaction       {snapshotter.last_snapshot_seconds:>8.3f} s  {os.path.getsize(snapshotter.path) / 1e6:.1f} MB")
+    await snapshotter.stop()
+
+    restored_manager = SessionManager(config)
+    restored = SessionSnapshotter(restored_manager, config)
+    assert restored.restore() == sessions
+    assert restored_manager.get_stats()["approx_bytes"] == manager.get_stats()["approx_bytes"]
+    assert restored_manager.sessions["session-0"] == manager.sessions["session-0"]
+    print(f"restore          {restored.restore_seconds:>8.3f} s  {sessions} sessions")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--dir", default=None, help="directory for the scratch snapshot files")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as scratch:
+        asyncio.run(bench(scratch, args.sessions))
+
+if __name__ == "__main__":
+    main()
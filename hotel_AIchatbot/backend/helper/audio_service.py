@@ -1,27 +1,244 @@
-import os
-from gtts import gTTS
-from fastapi import HTTPException
-from fastapi.responses import FileResponse
-
-class AudioService:
-    def __init__(self, audio_dir: str):
-        self.audio_dir = audio_dir
-        
-    async def generate_audio(self, text: str, audio_id: str) -> str:
-        """Generate audio file from text using gTTS"""
-        audio_path = os.path.join(self.audio_dir, f"{audio_id}.mp3")
-        
-        try:
-            tts = gTTS(text=text, lang='en', slow=False)
-            tts.save(audio_path)
-            return f"/audio/{audio_id}.mp3"
-        except Exception as e:
-            print(f"TTS generation error: {e}")
-            raise HTTPException(status_code=500, detail="Failed to generate audio response")
-    
-    async def get_audio_file(self, filename: str):
-        """Get audio file by filename"""
-        audio_path = os.path.join(self.audio_dir, filename)
-        if not os.path.exists(audio_path):
-            raise HTTPException(status_code=404, detail="Audio file not found")
-        return FileResponse(audio_path)
\ No newline at end of file
+import os
+import re
+import uuid
+import asyncio
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from fastapi import HTTPException
+from fastapi.responses import FileResponse, JSONResponse
+from helper.tts_engines import get_tts_engine
+
+class AudioService:
+    def __init__(self, config):
+        self.audio_dir = config["audio_dir"]
+        self.lang = config.get("tts_lang", "en")
+        self.tld = config.get("tts_tld", "com")
+        self.slow = config.get("tts_slow", False)
+        self.max_cache_bytes = config.get("audio_cache_max_bytes", 200 * 1024 * 1024)
+
+        # Synthesis runs off the event loop on a bounded worker pool
+        self.engine = get_tts_engine(config)
+        workers = config.get("tts_workers", 4)
+        if config.get("tts_pool", "thread") == "process":
+            self.executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts")
+        self.max_pending_jobs = config.get("tts_queue_size", 32)
+        self.job_timeout = config.get("tts_timeout", 30.0)
+        self.min_chunk_chars = config.get("tts_min_chunk_chars", 80)
+        self.pending_jobs = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.skipped = 0
+
+        # Deferred mode: replies return an audio_url right away and the file is
+        # rendered in the background ("deferred") or only when fetched ("lazy")
+        self.mode = config.get("audio_mode", "inline")
+        self.wait_seconds = config.get("audio_wait_seconds", 5.0)
+        self.max_pending_texts = config.get("audio_pending_max", 1000)
+        self.pending_texts = OrderedDict()
+        self.render_tasks = {}
+
+        # Content-addressed cache index: hash -> file size, least recently used first
+        self.cache_index = OrderedDict()
+        self.cache_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(self.audio_dir, exist_ok=True)
+        self._load_cache_index()
+
+    def _load_cache_index(self):
+        """Index cached audio files already on disk, oldest first"""
+        entries = []
+        for filename in os.listdir(self.audio_dir):
+            match = re.fullmatch(r"([0-9a-f]{64})\.mp3", filename)
+            if match:
+                stat = os.stat(os.path.join(self.audio_dir, filename))
+                entries.append((stat.st_mtime, match.group(1), stat.st_size))
+
+        for _, audio_hash, size in sorted(entries):
+            self.cache_index[audio_hash] = size
+            self.cache_bytes += size
+        self._evict()
+
+    def cache_key(self, text: str) -> str:
+        """Hash of the text and voice settings used to name the cached file"""
+        key = f"{self.engine.name}\0{self.lang}\0{self.tld}\0{self.slow}\0{text}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _evict(self):
+        """Remove least recently used files until the cache fits its size cap"""
+        while self.cache_bytes > self.max_cache_bytes and len(self.cache_index) > 1:
+            audio_hash, size = self.cache_index.popitem(last=False)
+            self.cache_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(os.path.join(self.audio_dir, f"{audio_hash}.mp3"))
+            except FileNotFoundError:
+                pass
+
+    def _split_sentences(self, text: str):
+        """Split text into sentence chunks of at least min_chunk_chars where possible"""
+        chunks = []
+        for sentence in re.split(r"(?<=[.!?])\s+", text.strip()):
+            if chunks and len(chunks[-1]) < self.min_chunk_chars:
+                chunks[-1] = f"{chunks[-1]} {sentence}"
+            elif sentence:
+                chunks.append(sentence)
+        return chunks or [text]
+
+    async def _synthesize(self, text: str) -> bytes:
+        """Synthesize sentence chunks concurrently on the worker pool and join the MP3 streams"""
+        loop = asyncio.get_running_loop()
+        jobs = [
+            loop.run_in_executor(self.executor, self.engine.synthesize, chunk, self.lang, self.tld, self.slow)
+            for chunk in self._split_sentences(text)
+        ]
+        try:
+            parts = await asyncio.gather(*jobs)
+        except BaseException:
+            # Drop chunks still waiting in the pool on timeout, disconnect or failure
+            for job in jobs:
+                job.cancel()
+            raise
+        return b"".join(parts)
+
+    def _write_file(self, audio_path: str, audio: bytes):
+        """Write audio atomically so partially written files are never served"""
+        tmp_path = f"{audio_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, audio_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    async def generate_audio(self, text: str) -> str:
+        """Generate audio file from text on the TTS pool, reusing a cached file for identical text"""
+        audio_hash = self.cache_key(text)
+        audio_path = os.path.join(self.audio_dir, f"{audio_hash}.mp3")
+        if audio_hash in self.cache_index and os.path.exists(audio_path):
+            self.cache_index.move_to_end(audio_hash)
+            self.hits += 1
+            return f"/audio/{audio_hash}.mp3"
+
+        self.misses += 1
+        if self.pending_jobs >= self.max_pending_jobs:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Audio generation queue is full")
+
+        self.pending_jobs += 1
+        try:
+            audio = await asyncio.wait_for(self._synthesize(text), timeout=self.job_timeout)
+            await asyncio.to_thread(self._write_file, audio_path, audio)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            print(f"TTS generation timed out after {self.job_timeout}s")
+            raise HTTPException(status_code=504, detail="Audio generation timed out")
+        except Exception as e:
+            print(f"TTS generation error: {e}")
+            raise HTTPException(status_code=500, detail="Failed to generate audio response")
+        finally:
+            self.pending_jobs -= 1
+
+        self.cache_bytes -= self.cache_index.pop(audio_hash, 0)
+        self.cache_index[audio_hash] = len(audio)
+        self.cache_bytes += len(audio)
+        self._evict()
+        return f"/audio/{audio_hash}.mp3"
+
+    async def get_audio_url(self, text: str) -> str:
+        """Audio URL for a reply, rendered now in inline mode or scheduled otherwise"""
+        if self.mode == "inline":
+            return await self.generate_audio(text)
+
+        audio_hash = self.cache_key(text)
+        if audio_hash in self.cache_index:
+            self.cache_index.move_to_end(audio_hash)
+            self.hits += 1
+            return f"/audio/{audio_hash}.mp3"
+
+        self.pending_texts[audio_hash] = text
+        self.pending_texts.move_to_end(audio_hash)
+        while len(self.pending_texts) > self.max_pending_texts:
+            self.pending_texts.popitem(last=False)
+
+        if self.mode == "deferred":
+            self._start_render(audio_hash)
+        return f"/audio/{audio_hash}.mp3"
+
+    async def get_audio_url_or_none(self, text: str):
+        """Audio URL for a reply, or None if audio cannot be produced; the text reply never fails because of audio"""
+        try:
+            return await self.get_audio_url(text)
+        except HTTPException as e:
+            self.skipped += 1
+            print(f"Audio skipped: {e.detail}")
+            return None
+
+    def _start_render(self, audio_hash: str):
+        """Start (or join) the background render job for a pending text"""
+        task = self.render_tasks.get(audio_hash)
+        if task is None:
+            task = asyncio.create_task(self._render(audio_hash, self.pending_texts[audio_hash]))
+            self.render_tasks[audio_hash] = task
+            task.add_done_callback(lambda _: self.render_tasks.pop(audio_hash, None))
+        return task
+
+    async def _render(self, audio_hash: str, text: str):
+        """Render a pending text to its cache file"""
+        try:
+            await self.generate_audio(text)
+            self.pending_texts.pop(audio_hash, None)
+        except Exception as e:
+            print(f"Deferred TTS error: {e}")
+
+    async def get_audio_file(self, filename: str):
+        """Get audio file by filename, waiting briefly for pending renders"""
+        audio_path = os.path.join(self.audio_dir, filename)
+        audio_hash = filename.removesuffix(".mp3")
+
+        if not os.path.exists(audio_path) and (audio_hash in self.render_tasks or audio_hash in self.pending_texts):
+            # Render on demand if the job was never started or was dropped
+            task = self._start_render(audio_hash) if audio_hash in self.pending_texts else self.render_tasks[audio_hash]
+            try:
+                await asyncio.wait_for(asyncio.shield(task), timeout=self.wait_seconds)
+            except asyncio.TimeoutError:
+                return JSONResponse(
+                    status_code=202,
+                    content={"status": "pending"},
+                    headers={"Retry-After": "1"}
+                )
+
+        if not os.path.exists(audio_path):
+            raise HTTPException(status_code=404, detail="Audio file not found")
+
+        if audio_hash in self.cache_index:
+            self.cache_index.move_to_end(audio_hash)
+        return FileResponse(audio_path)
+
+    def close(self):
+        """Stop the TTS worker pool, dropping queued jobs"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self):
+        """Audio cache hit/miss counters and size"""
+        return {
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "cache_evictions": self.evictions,
+            "cached_files": len(self.cache_index),
+            "cached_bytes": self.cache_bytes,
+            "max_cache_bytes": self.max_cache_bytes,
+            "pending_jobs": self.pending_jobs,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "skipped": self.skipped,
+            "audio_mode": self.mode,
+            "pending_texts": len(self.pending_texts),
+            "render_jobs": len(self.render_tasks),
+        }
\ No newline at end of file
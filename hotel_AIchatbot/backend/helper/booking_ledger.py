@@ -0,0 +1,121 @@
+import json
+import time
+import queue
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import Future
+
+class BookingLedger:
+    """Append-only SQLite ledger of confirmed bookings with group commit"""
+
+    def __init__(self, db_path: str, max_batch: int = 256, max_delay: float = 0.0):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.appended = 0
+        self.commits = 0
+        self._queue = queue.SimpleQueue()
+
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS bookings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                hotel_name TEXT NOT NULL,
+                check_in TEXT NOT NULL,
+                check_out TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                data TEXT NOT NULL
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name="booking-ledger", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        """Open a connection in WAL mode with a full fsync on every commit"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        return conn
+
+    async def append(self, booking: dict) -> int:
+        """Durably append one booking and return its ledger id"""
+        return (await self.append_many([booking]))[0]
+
+    async def append_many(self, bookings: list[dict]) -> list[int]:
+        """Durably append bookings in a single transaction and return their ledger ids"""
+        future = Future()
+        self._queue.put((bookings, future))
+        return await asyncio.wrap_future(future)
+
+    def _write_loop(self):
+        """Writer thread: commit everything queued in one transaction, so concurrent appends share one fsync"""
+        conn = self._connect()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            # With no delay a batch is whatever queued up during the previous commit's fsync
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+
+            try:
+                results = []
+                with conn:
+                    for bookings, _ in batch:
+                        ids = []
+                        for booking in bookings:
+                            cursor = conn.execute(
+                                "INSERT INTO bookings (hotel_name, check_in, check_out, created_at, data) VALUES (?, ?, ?, ?, ?)",
+                                (booking["hotel_name"], booking["check_in"], booking["check_out"], time.time(), json.dumps(booking))
+                            )
+                            ids.append(cursor.lastrowid)
+                        results.append(ids)
+            except Exception as e:
+                print(f"Booking ledger write error: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.commits += 1
+            for (bookings, future), ids in zip(batch, results):
+                self.appended += len(bookings)
+                future.set_result(ids)
+        conn.close()
+
+    def replay(self):
+        """Yield every recorded booking in commit order, for crash recovery on startup"""
+        conn = self._connect()
+        try:
+            for booking_id, data in conn.execute("SELECT id, data FROM bookings ORDER BY id"):
+                booking = json.loads(data)
+                booking["booking_id"] = booking_id
+                yield booking
+        finally:
+            conn.close()
+
+    def close(self):
+        """Flush queued appends and stop the writer thread"""
+        self._queue.put(None)
+        self._writer.join()
+
+    def get_stats(self):
+        """Append and group-commit counters"""
+        return {
+            "appended": self.appended,
+            "commits": self.commits,
+            "avg_batch_size": round(self.appended / self.commits, 2) if self.commits else 0,
+        }
\ No newline at end of file
@@ -1,253 +1,538 @@
-import re
-import json
-from datetime import datetime
-from fastapi import HTTPException
-from helper.models import BookingDetails
-
-class BookingService:
-    def __init__(self, hotel_service, ollama_service, session_manager):
-        self.hotel_service = hotel_service
-        self.ollama_service = ollama_service
-        self.session_manager = session_manager
-        self.date_patterns = [
-            r'\b(january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2}',
-            r'\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}',
-            r'\b\d{4}-\d{2}-\d{2}',
-            r'\bfrom\s+.*?\s+to\s+',
-            r'\bcheck.?in.*?\d',
-            r'\bcheck.?out.*?\d'
-        ]
-    
-    async def process_chat_message(self, session_id: str, message: str):
-        """Process a chat message and return response"""
-        session = self.session_manager.get_session_data(session_id)
-        self.session_manager.add_message(session_id, "user", message)
-        
-        # Check for location and dates in initial step
-        if session["current_step"] == "initial":
-            return await self._handle_initial_step(session_id, message, session)
-        else:
-            return await self._handle_booking_steps(session_id, message, session)
-    
-    async def _handle_initial_step(self, session_id: str, message: str, session):
-        """Handle the initial step of the conversation"""
-        location = self.hotel_service.extract_location_from_message(message)
-        has_dates = any(re.search(pattern, message.lower()) for pattern in self.date_patterns)
-        
-        if location and has_dates:
-            session["user_location"] = location
-            session["user_dates"] = True
-            session["current_step"] = "showing_hotels"
-            self.session_manager.update_session_data(session_id, "user_location", location)
-            self.session_manager.update_session_data(session_id, "user_dates", True)
-            self.session_manager.update_session_data(session_id, "current_step", "showing_hotels")
-            
-            reply = self.hotel_service.format_hotel_list(location)
-            self.session_manager.add_message(session_id, "assistant", reply)
-            
-            filtered_hotels = self.hotel_service.get_hotels_by_location(location)
-            
-            return {
-                "reply": reply,
-                "hotels": filtered_hotels,
-                "selected_hotel_details": None,
-                "step": session["current_step"],
-                "image_url": None,
-            }
-        else:
-            
-            try:
-                conversation = self.session_manager.get_session(session_id)
-                reply = self.ollama_service.chat(conversation)
-                self.session_manager.add_message(session_id, "assistant", reply)
-            except Exception as e:
-                print(f"Ollama chat error: {e}")
-                # Fallback responses
-                if not location and not has_dates:
-                    reply = "I'd be happy to help you find a hotel! Could you please tell me which location you're interested in and your travel dates?"
-                elif not location:
-                    reply = "Great! I see you have dates in mind. Which location would you like to stay in?"
-                elif not has_dates:
-                    reply = f"Perfect! I can help you find hotels in {location}. What are your check-in and check-out dates?"
-                self.session_manager.add_message(session_id, "assistant", reply)
-            
-            return {
-                "reply": reply,
-                "hotels": None,
-                "selected_hotel_details": None,
-                "step": session["current_step"],
-                "image_url": None,
-            }
-    
-    async def _handle_booking_steps(self, session_id: str, message: str, session):
-        """Handle booking steps after initial conversation"""
-        try:
-            conversation = self.session_manager.get_session(session_id)
-            reply = self.ollama_service.chat(conversation)
-            self.session_manager.add_message(session_id, "assistant", reply)
-            
-            # Check if a hotel has been selected
-            if session["selected_hotel"] is None and session["current_step"] == "showing_hotels":
-                reply = await self._handle_hotel_selection(session_id, message, session, reply)
-            
-            # Extract booking details
-            if session["selected_hotel"]:
-                reply = await self._extract_booking_details(session_id, message, session, reply)
-            
-        except Exception as e:
-            print(f"Ollama chat error: {e}")
-            reply = "I'm sorry, I'm having trouble processing your request. Please try again."
-            self.session_manager.add_message(session_id, "assistant", reply)
-        
-        # Prepare response
-        image_url = None
-        if session.get("selected_hotel_image_url") and not session.get("image_sent"):
-            image_url = session["selected_hotel_image_url"]
-            self.session_manager.update_session_data(session_id, "image_sent", True)
-        
-        response_data = {
-            "reply": reply,
-            "hotels": None,
-            "selected_hotel_details": session["selected_hotel_details"] if session["current_step"] != "initial" else None,
-            "step": session["current_step"],
-            "image_url": image_url,
-        }
-        
-        
-        if session["current_step"] == "completed":
-            booking_details = BookingDetails(
-                hotel_name=session["selected_hotel"],
-                room_type=session["selected_hotel_details"].get("room_type", session["selected_hotel_details"]["hotel_name"]),
-                check_in=session["check_in"],
-                check_out=session["check_out"],
-                guests=session["num_guests"],
-                guest_names=session["guest_names"],
-                phone=session["phone"],
-                location=session["selected_hotel_details"]["location"]
-            )
-            return await self.confirm_booking(session_id, booking_details)
-        
-        return response_data
-    
-    async def _handle_hotel_selection(self, session_id: str, message: str, session, reply):
-        """Handle hotel selection logic"""
-        location_hotels = self.hotel_service.get_hotels_by_location(session["user_location"])
-        
-        for hotel in location_hotels:
-            if hotel["hotel_name"].lower() in message.lower():
-                self.session_manager.update_session_data(session_id, "selected_hotel", hotel["hotel_name"])
-                self.session_manager.update_session_data(session_id, "selected_hotel_details", hotel)
-                self.session_manager.update_session_data(session_id, "selected_hotel_image_url", hotel.get("image_url"))
-                self.session_manager.update_session_data(session_id, "current_step", "check_in")
-                
-                amenities = ", ".join(hotel.get("amenities", []) or ["None"])
-                facilities = ", ".join(hotel.get("facilities", []) or ["None"])
-                
-                reply = (
-                    f"You selected {hotel['hotel_name']} in {hotel['location']}.\n"
-                    f"Capacity: Up to {hotel['number_of_guests']} guests\n"
-                    f"Amenities: {amenities}\n"
-                    f"Facilities: {facilities}\n"
-                    f"Please provide your check-in date in YYYY-MM-DD format (e.g., 2025-05-20)."
-                )
-                break
-        
-        return reply
-    
-    async def _extract_booking_details(self, session_id: str, message: str, session, reply):
-        """Extract booking details from user messages"""
-        if session["current_step"] == "check_in" and session["check_in"] is None:
-            reply = self._handle_check_in_date(session_id, message, session)
-        elif session["current_step"] == "check_out" and session["check_out"] is None:
-            reply = self._handle_check_out_date(session_id, message, session)
-        elif session["current_step"] == "num_guests" and session["num_guests"] is None:
-            reply = self._handle_guest_count(session_id, message, session)
-        elif session["current_step"] == "guest_names" and len(session["guest_names"]) < session["num_guests"]:
-            reply = self._handle_guest_names(session_id, message, session)
-        elif session["current_step"] == "phone" and session["phone"] is None:
-            reply = self._handle_phone_number(session_id, message, session)
-        
-        return reply
-    
-    def _handle_check_in_date(self, session_id: str, message: str, session):
-        """Handle check-in date extraction"""
-        date_match = re.search(r"\d{4}-\d{2}-\d{2}", message)
-        if date_match:
-            try:
-                datetime.strptime(date_match.group(0), "%Y-%m-%d")
-                self.session_manager.update_session_data(session_id, "check_in", date_match.group(0))
-                self.session_manager.update_session_data(session_id, "current_step", "check_out")
-                return f"Check-in date set to {date_match.group(0)}. Please provide your check-out date in YYYY-MM-DD format (e.g., 2025-05-25)."
-            except ValueError:
-                return "Invalid date format. Please provide your check-in date in YYYY-MM-DD format (e.g., 2025-05-20)."
-        else:
-            return "Please provide your check-in date in YYYY-MM-DD format (e.g., 2025-05-20)."
-    
-    def _handle_check_out_date(self, session_id: str, message: str, session):
-        """Handle check-out date extraction"""
-        date_match = re.search(r"\d{4}-\d{2}-\d{2}", message)
-        if date_match:
-            try:
-                datetime.strptime(date_match.group(0), "%Y-%m-%d")
-                self.session_manager.update_session_data(session_id, "check_out", date_match.group(0))
-                self.session_manager.update_session_data(session_id, "current_step", "num_guests")
-                return f"Check-out date set to {date_match.group(0)}. How many guests will be staying? (Max: {session['selected_hotel_details']['number_of_guests']})"
-            except ValueError:
-                return "Invalid date format. Please provide your check-out date in YYYY-MM-DD format (e.g., 2025-05-25)."
-        else:
-            return "Please provide your check-out date in YYYY-MM-DD format (e.g., 2025-05-25)."
-    
-    def _handle_guest_count(self, session_id: str, message: str, session):
-        """Handle guest count extraction"""
-        num_match = re.search(r"\d+", message)
-        if num_match:
-            num_guests = int(num_match.group(0))
-            max_guests = session["selected_hotel_details"]["number_of_guests"]
-            if num_guests > max_guests:
-                return f"Sorry, this hotel can only accommodate up to {max_guests} guests. Please provide a number of guests within this limit."
-            elif num_guests <= 0:
-                return "Please provide a valid number of guests (greater than 0)."
-            else:
-                self.session_manager.update_session_data(session_id, "num_guests", num_guests)
-                self.session_manager.update_session_data(session_id, "current_step", "guest_names")
-                return f"Got it, {num_guests} guests. Please provide the name of guest 1."
-        else:
-            return "Please provide the number of guests as a number (e.g., 2)."
-    
-    def _handle_guest_names(self, session_id: str, message: str, session):
-        """Handle guest names collection"""
-        name = message.strip()
-        if name:
-            session["guest_names"].append(name)
-            self.session_manager.update_session_data(session_id, "guest_names", session["guest_names"])
-            
-            if len(session["guest_names"]) < session["num_guests"]:
-                return f"Guest {len(session['guest_names'])} name recorded as {name}. Please provide the name of guest {len(session['guest_names']) + 1}."
-            else:
-                self.session_manager.update_session_data(session_id, "current_step", "phone")
-                return f"Guest {len(session['guest_names'])} name recorded as {name}. All guest names collected. Please provide your phone number in XXX-XXX-XXXX format (e.g., 123-456-7890)."
-        else:
-            return f"Please provide the name of guest {len(session['guest_names']) + 1}."
-    
-    def _handle_phone_number(self, session_id: str, message: str, session):
-        """Handle phone number extraction"""
-        phone_match = re.search(r"\d{3}-\d{3}-\d{4}", message)
-        if phone_match:
-            self.session_manager.update_session_data(session_id, "phone", phone_match.group(0))
-            self.session_manager.update_session_data(session_id, "current_step", "completed")
-            return "Thank you for providing your details. I'll process your booking now."
-        else:
-            return "Please provide your phone number in XXX-XXX-XXXX format (e.g., 123-456-7890)."
-    
-    async def confirm_booking(self, session_id: str, details: BookingDetails):
-        """Confirm a booking"""
-        # Validate dates
-        try:
-            check_in_date = datetime.strptime(details.check_in, "%Y-%m-%d")
-            check_out_date = datetime.strptime(details.check_out, "%Y-%m-%d")
-            if check_out_date <= check_in_date:
-                raise ValueError("Check-out date must be after check-in date")
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
-        
-        
\ No newline at end of file
+import re
+import json
+from collections import Counter
+from datetime import date, datetime
+from fastapi import HTTPException
+from pydantic import ValidationError
+from helper.models import BookingDetails
+from helper.context_builder import ContextBuilder
+from helper.date_parser import DateParser
+from helper.inventory import FIRST_DATE, LAST_DATE
+
+BOOKING_JSON_KEYS = ("hotel_name", "check_in", "check_out", "guests", "guest_names", "phone", "location")
+
+class BookingService:
+    def __init__(self, hotel_service, ollama_service, session_manager, inventory, ledger, quote_engine, config):
+        self.hotel_service = hotel_service
+        self.ollama_service = ollama_service
+        self.session_manager = session_manager
+        self.inventory = inventory
+        self.ledger = ledger
+        self.quote_engine = quote_engine
+        self.confirmation_mode = config.get("confirmation_mode", "deterministic")
+        if self.confirmation_mode not in ("deterministic", "llm"):
+            raise ValueError(f"Unknown confirmation mode: {self.confirmation_mode}")
+        self.llm_calls = Counter()
+        self.llm_calls_avoided = Counter()
+        self.llm_json_mismatches = 0
+        self.context_builder = ContextBuilder(config)
+        # Dates the inventory cannot hold are skipped, so the guest is asked again
+        self.date_parser = DateParser(config["date_pattern"], FIRST_DATE, LAST_DATE)
+    
+    async def process_chat_message(self, session_id: str, message: str, on_token=None):
+        """Process a chat message and return response, streaming LLM tokens to on_token if given"""
+        session = self.session_manager.get_session_data(session_id)
+        self.session_manager.add_message(session_id, "user", message)
+        
+        # Check for location and dates in initial step
+        if session["current_step"] == "initial":
+            return await self._handle_initial_step(session_id, message, session, on_token)
+        else:
+            return await self._handle_booking_steps(session_id, message, session, on_token)
+    
+    def _prompt(self, session_id: str):
+        """The session's conversation trimmed to the prompt token budget"""
+        session = self.session_manager.get_session_data(session_id)
+        return self.context_builder.build(
+            self.session_manager.get_session(session_id), session, self._selected_hotel(session)
+        )
+    
+    def _selected_hotel(self, session):
+        """Catalog entry of the session's selected hotel, or None"""
+        if session["selected_hotel"] is None:
+            return None
+        return self.hotel_service.get_hotel_by_name(session["selected_hotel"])
+    
+    async def _generate_reply(self, conversation, on_token=None, **kwargs):
+        """Get an LLM reply, relaying tokens to on_token when streaming"""
+        if on_token is None:
+            return await self.ollama_service.chat(conversation, **kwargs)
+        
+        tokens = []
+        async for token in self.ollama_service.chat_stream(conversation, **kwargs):
+            tokens.append(token)
+            await on_token(token)
+        return "".join(tokens).strip()
+    
+    async def _handle_initial_step(self, session_id: str, message: str, session, on_token=None):
+        """Handle the initial step of the conversation"""
+        location = self.hotel_service.extract_location_from_message(message)
+        dates = self.date_parser.find(message)
+        has_dates = dates is not None
+        
+        if location and has_dates:
+            user_dates = [dates.start.isoformat(), dates.end.isoformat() if dates.end else None]
+            session["user_location"] = location
+            session["user_dates"] = user_dates
+            session["current_step"] = "showing_hotels"
+            self.session_manager.update_session_data(session_id, "user_location", location)
+            self.session_manager.update_session_data(session_id, "user_dates", user_dates)
+            self.session_manager.update_session_data(session_id, "current_step", "showing_hotels")
+            
+            available = self._availability_filter(session)
+            reply = self.hotel_service.format_hotel_list(
+                location, available, self._stay_quote(session), self._listing_variant(session)
+            )
+            self.session_manager.add_message(session_id, "assistant", reply)
+            self.llm_calls_avoided["initial"] += 1
+            
+            filtered_hotels = self.hotel_service.get_hotels_by_location(location, available)
+            
+            return {
+                "reply": reply,
+                "hotels": filtered_hotels,
+                "selected_hotel_details": None,
+                "step": session["current_step"],
+                "image_url": None,
+            }
+        else:
+            
+            try:
+                conversation = self._prompt(session_id)
+                self.llm_calls["initial"] += 1
+                reply = await self._generate_reply(conversation, on_token)
+                self.session_manager.add_message(session_id, "assistant", reply)
+            except Exception as e:
+                print(f"Ollama chat error: {e}")
+                # Fallback responses
+                if not location and not has_dates:
+                    reply = "I'd be happy to help you find a hotel! Could you please tell me which location you're interested in and your travel dates?"
+                elif not location:
+                    reply = "Great! I see you have dates in mind. Which location would you like to stay in?"
+                elif not has_dates:
+                    reply = f"Perfect! I can help you find hotels in {location}. What are your check-in and check-out dates?"
+                self.session_manager.add_message(session_id, "assistant", reply)
+            
+            return {
+                "reply": reply,
+                "hotels": None,
+                "selected_hotel_details": None,
+                "step": session["current_step"],
+                "image_url": None,
+            }
+    
+    async def _handle_booking_steps(self, session_id: str, message: str, session, on_token=None):
+        """Handle booking steps after initial conversation"""
+        step = session["current_step"]
+        try:
+            # Deterministic handlers first; only fall back to the LLM when none applies
+            reply = self._route_booking_step(session_id, message, session)
+            if reply is not None:
+                self.llm_calls_avoided[step] += 1
+            else:
+                conversation = self._prompt(session_id)
+                self.llm_calls[step] += 1
+                reply = await self._generate_reply(conversation, on_token)
+            self.session_manager.add_message(session_id, "assistant", reply)
+            
+        except Exception as e:
+            print(f"Ollama chat error: {e}")
+            reply = "I'm sorry, I'm having trouble processing your request. Please try again."
+            self.session_manager.add_message(session_id, "assistant", reply)
+        
+        # Prepare response
+        selected_hotel = self._selected_hotel(session)
+        image_url = None
+        if selected_hotel and selected_hotel.get("image_url") and not session["image_sent"]:
+            image_url = selected_hotel["image_url"]
+            self.session_manager.update_session_data(session_id, "image_sent", True)
+        
+        response_data = {
+            "reply": reply,
+            "hotels": None,
+            "selected_hotel_details": selected_hotel if session["current_step"] != "initial" else None,
+            "step": session["current_step"],
+            "image_url": image_url,
+        }
+        
+        
+        if session["current_step"] == "completed":
+            booking_details = BookingDetails(
+                hotel_name=session["selected_hotel"],
+                room_type=selected_hotel.get("room_type", selected_hotel["hotel_name"]),
+                check_in=session["check_in"],
+                check_out=session["check_out"],
+                guests=session["num_guests"],
+                guest_names=session["guest_names"],
+                phone=session["phone"],
+                location=selected_hotel["location"]
+            )
+            try:
+                confirmation = await self.confirm_booking(session_id, booking_details, on_token)
+            except HTTPException as e:
+                if e.status_code != 409:
+                    raise
+                return self._choose_new_dates(session_id, session, response_data)
+            # The booking is done, so the next message starts a new one
+            self.session_manager.reset_booking(session_id)
+            return confirmation
+        
+        return response_data
+    
+    def _choose_new_dates(self, session_id: str, session, response_data):
+        """Send the guest back to the check-in step when their nights were booked before confirmation"""
+        self.session_manager.update_session_data(session_id, "check_in", None)
+        self.session_manager.update_session_data(session_id, "check_out", None)
+        self.session_manager.update_session_data(session_id, "current_step", "check_in")
+        reply = f"Sorry, {session['selected_hotel']} was just booked for some of those nights. Please provide a different check-in date in YYYY-MM-DD format (e.g., 2025-05-20)."
+        self.session_manager.add_message(session_id, "assistant", reply)
+        return {**response_data, "reply": reply, "step": "check_in"}
+    
+    def _stay_dates(self, session):
+        """The session's check-in and check-out dates, falling back to the range from the first message"""
+        if session["check_in"] and session["check_out"]:
+            return session["check_in"], session["check_out"]
+        if session["user_dates"] and session["user_dates"][1] and not session["check_in"]:
+            return tuple(session["user_dates"])
+        return None
+    
+    def _availability_filter(self, session):
+        """Predicate keeping hotels free for the session's dates, or None while dates are unknown"""
+        stay = self._stay_dates(session)
+        if stay:
+            return self.inventory.availability_filter(*stay)
+        return None
+    
+    def _stay_quote(self, session):
+        """Quote function for the session's stay, or None while its dates are unknown"""
+        stay = self._stay_dates(session)
+        if not stay:
+            return None
+        check_in, check_out = stay
+        return lambda catalog, hotel_ids: self.quote_engine.quote_ids(catalog, hotel_ids, check_in, check_out)
+    
+    def _listing_variant(self, session):
+        """Cache key for the session's filtered and priced hotel list: its stay and the inventory version"""
+        stay = self._stay_dates(session)
+        return (*stay, self.inventory.version) if stay else None
+    
+    def _route_booking_step(self, session_id: str, message: str, session):
+        """Produce a reply for the current step without the LLM, or None if not possible"""
+        # Check if a hotel has been selected
+        if session["selected_hotel"] is None and session["current_step"] == "showing_hotels":
+            return self._handle_hotel_selection(session_id, message, session)
+        
+        # Extract booking details
+        if session["selected_hotel"]:
+            return self._extract_booking_details(session_id, message, session)
+        
+        return None
+    
+    def _handle_hotel_selection(self, session_id: str, message: str, session):
+        """Handle hotel selection logic"""
+        location_hotels = self.hotel_service.get_hotels_by_location(session["user_location"], self._availability_filter(session))
+        
+        reply = None
+        for hotel in location_hotels:
+            if hotel["hotel_name"].lower() in message.lower():
+                self.session_manager.update_session_data(session_id, "selected_hotel", hotel["hotel_name"])
+                self.session_manager.update_session_data(session_id, "current_step", "check_in")
+                
+                amenities = ", ".join(hotel.get("amenities", []) or ["None"])
+                facilities = ", ".join(hotel.get("facilities", []) or ["None"])
+                
+                reply = (
+                    f"You selected {hotel['hotel_name']} in {hotel['location']}.\n"
+                    f"Capacity: Up to {hotel['number_of_guests']} guests\n"
+                    f"Amenities: {amenities}\n"
+                    f"Facilities: {facilities}\n"
+                    f"Please provide your check-in date in YYYY-MM-DD format (e.g., 2025-05-20)."
+                )
+                break
+        
+        return reply
+    
+    def _extract_booking_details(self, session_id: str, message: str, session):
+        """Extract booking details from user messages"""
+        reply = None
+        if session["current_step"] == "check_in" and session["check_in"] is None:
+            reply = self._handle_check_in_date(session_id, message, session)
+        elif session["current_step"] == "check_out" and session["check_out"] is None:
+            reply = self._handle_check_out_date(session_id, message, session)
+        elif session["current_step"] == "num_guests" and session["num_guests"] is None:
+            reply = self._handle_guest_count(session_id, message, session)
+        elif session["current_step"] == "guest_names" and len(session["guest_names"]) < session["num_guests"]:
+            reply = self._handle_guest_names(session_id, message, session)
+        elif session["current_step"] == "phone" and session["phone"] is None:
+            reply = self._handle_phone_number(session_id, message, session)
+        
+        return reply
+    
+    def _handle_check_in_date(self, session_id: str, message: str, session):
+        """Handle check-in date extraction"""
+        dates = self.date_parser.find(message)
+        if dates:
+            check_in = dates.start.isoformat()
+            self.session_manager.update_session_data(session_id, "check_in", check_in)
+            self.session_manager.update_session_data(session_id, "current_step", "check_out")
+            return f"Check-in date set to {check_in}. Please provide your check-out date in YYYY-MM-DD format (e.g., 2025-05-25)."
+        else:
+            return "Please provide your check-in date in YYYY-MM-DD format (e.g., 2025-05-20)."
+    
+    def _handle_check_out_date(self, session_id: str, message: str, session):
+        """Handle check-out date extraction"""
+        dates = self.date_parser.find(message)
+        if dates:
+            # A full range here restates the stay, so its end is the check-out
+            check_out_date = dates.end or dates.start
+            check_out = check_out_date.isoformat()
+            if check_out_date <= date.fromisoformat(session["check_in"]):
+                return f"Check-out date must be after your check-in date ({session['check_in']}). Please provide your check-out date in YYYY-MM-DD format (e.g., 2025-05-25)."
+            if not self.inventory.is_available(session["selected_hotel"], session["check_in"], check_out):
+                self.session_manager.update_session_data(session_id, "check_in", None)
+                self.session_manager.update_session_data(session_id, "current_step", "check_in")
+                return f"Sorry, {session['selected_hotel']} is already booked for some of those nights. Please provide a different check-in date in YYYY-MM-DD format (e.g., 2025-05-20)."
+            self.session_manager.update_session_data(session_id, "check_out", check_out)
+            if session["phone"]:
+                # New dates after a failed confirmation; the other details are already collected
+                self.session_manager.update_session_data(session_id, "current_step", "completed")
+                return f"Check-out date set to {check_out}. I'll process your booking now."
+            self.session_manager.update_session_data(session_id, "current_step", "num_guests")
+            return f"Check-out date set to {check_out}. How many guests will be staying? (Max: {self._selected_hotel(session)['number_of_guests']})"
+        else:
+            return "Please provide your check-out date in YYYY-MM-DD format (e.g., 2025-05-25)."
+    
+    def _handle_guest_count(self, session_id: str, message: str, session):
+        """Handle guest count extraction"""
+        num_match = re.search(r"\d+", message)
+        if num_match:
+            num_guests = int(num_match.group(0))
+            max_guests = self._selected_hotel(session)["number_of_guests"]
+            if num_guests > max_guests:
+                return f"Sorry, this hotel can only accommodate up to {max_guests} guests. Please provide a number of guests within this limit."
+            elif num_guests <= 0:
+                return "Please provide a valid number of guests (greater than 0)."
+            else:
+                self.session_manager.update_session_data(session_id, "num_guests", num_guests)
+                self.session_manager.update_session_data(session_id, "current_step", "guest_names")
+                return f"Got it, {num_guests} guests. Please provide the name of guest 1."
+        else:
+            return "Please provide the number of guests as a number (e.g., 2)."
+    
+    def _handle_guest_names(self, session_id: str, message: str, session):
+        """Handle guest names collection"""
+        name = message.strip()
+        if name:
+            session["guest_names"].append(name)
+            self.session_manager.update_session_data(session_id, "guest_names", session["guest_names"])
+            
+            if len(session["guest_names"]) < session["num_guests"]:
+                return f"Guest {len(session['guest_names'])} name recorded as {name}. Please provide the name of guest {len(session['guest_names']) + 1}."
+            else:
+                self.session_manager.update_session_data(session_id, "current_step", "phone")
+                return f"Guest {len(session['guest_names'])} name recorded as {name}. All guest names collected. Please provide your phone number in XXX-XXX-XXXX format (e.g., 123-456-7890)."
+        else:
+            return f"Please provide the name of guest {len(session['guest_names']) + 1}."
+    
+    def _handle_phone_number(self, session_id: str, message: str, session):
+        """Handle phone number extraction"""
+        phone_match = re.search(r"\d{3}-\d{3}-\d{4}", message)
+        if phone_match:
+            self.session_manager.update_session_data(session_id, "phone", phone_match.group(0))
+            self.session_manager.update_session_data(session_id, "current_step", "completed")
+            return "Thank you for providing your details. I'll process your booking now."
+        else:
+            return "Please provide your phone number in XXX-XXX-XXXX format (e.g., 123-456-7890)."
+    
+    def _check_booking(self, details: BookingDetails):
+        """Validate a booking against the catalog; returns the hotel and number of nights"""
+        # Validate dates
+        try:
+            check_in_date = datetime.strptime(details.check_in, "%Y-%m-%d")
+            check_out_date = datetime.strptime(details.check_out, "%Y-%m-%d")
+            if check_out_date <= check_in_date:
+                raise ValueError("Check-out date must be after check-in date")
+            if check_in_date.date() < FIRST_DATE or check_out_date.date() > LAST_DATE:
+                raise ValueError(f"Dates must be between {FIRST_DATE} and {LAST_DATE}")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if details.guests != len(details.guest_names):
+            raise HTTPException(status_code=400, detail="Number of guests must match the number of guest names")
+        
+        selected_hotel = self.hotel_service.get_hotel_by_name(details.hotel_name)
+        if not selected_hotel:
+            raise HTTPException(status_code=404, detail="Selected hotel not found")
+        if details.guests > selected_hotel["number_of_guests"]:
+            raise HTTPException(status_code=400, detail=f"Number of guests ({details.guests}) exceeds hotel capacity ({selected_hotel['number_of_guests']})")
+        if not self.inventory.is_available(details.hotel_name, details.check_in, details.check_out):
+            raise HTTPException(status_code=409, detail=f"{details.hotel_name} is not available for the selected dates")
+        
+        return selected_hotel, (check_out_date - check_in_date).days
+    
+    def _price_booking(self, details: BookingDetails):
+        """Nightly price, subtotal, tax and total for a stay under the configured pricing rules"""
+        return self.quote_engine.quote_hotel(details.hotel_name, details.check_in, details.check_out)
+    
+    def _booking_summary(self, details: BookingDetails, price):
+        """Spoken confirmation text for a booking"""
+        return (
+            f"Booking confirmed for {details.hotel_name}!\n"
+            f"Location: {details.location}\n"
+            f"Check-in: {details.check_in}, Check-out: {details.check_out} ({price['nights']} nights)\n"
+            f"Guests: {details.guests} ({', '.join(details.guest_names)})\n"
+            f"Phone: {details.phone}\n"
+            f"Total: ${price['total']:.2f} (${price['subtotal']:.2f} + ${price['tax']:.2f} tax)"
+        )
+    
+    async def confirm_booking(self, session_id: str, details: BookingDetails, on_token=None):
+        """Confirm a booking"""
+        self._check_booking(details)
+        price = self._price_booking(details)
+        summary = self._booking_summary(details, price)
+        
+        json_data = {
+            "hotel_name": details.hotel_name,
+            "check_in": details.check_in,
+            "check_out": details.check_out,
+            "guests": details.guests,
+            "guest_names": details.guest_names,
+            "phone": details.phone,
+            "location": details.location
+        }
+        
+        if self.confirmation_mode == "deterministic":
+            reply = summary
+            self.llm_calls_avoided["confirm"] += 1
+        else:
+            reply = await self._confirm_with_llm(session_id, details, json_data, summary, on_token)
+        json_data.update(price)
+        
+        # Reserve and persist; no await between the availability check and the reservation
+        if not self.inventory.reserve(details.hotel_name, details.check_in, details.check_out):
+            raise HTTPException(status_code=409, detail=f"{details.hotel_name} is not available for the selected dates")
+        try:
+            json_data["booking_id"] = await self.ledger.append({**details.model_dump(), **price})
+        except Exception as e:
+            self.inventory.release(details.hotel_name, details.check_in, details.check_out)
+            print(f"Booking ledger error: {e}")
+            raise HTTPException(status_code=500, detail="Failed to record booking")
+        # Only a stored booking is confirmed in the history the LLM sees later
+        self.session_manager.add_message(session_id, "assistant", reply)
+        
+        return {
+            "reply": reply,
+            "final": True,
+            "json": json_data,
+            "step": "completed",
+        }
+    
+    async def confirm_batch(self, bookings: list[dict], include_summary: bool = False):
+        """Validate, reserve and persist many bookings at once, returning a result per item"""
+        results = []
+        accepted = []
+        for index, raw_booking in enumerate(bookings):
+            try:
+                details = BookingDetails.model_validate(raw_booking)
+                self._check_booking(details)
+                # Reserving as we go also catches overlaps within the batch
+                if not self.inventory.reserve(details.hotel_name, details.check_in, details.check_out):
+                    raise HTTPException(status_code=409, detail=f"{details.hotel_name} is not available for the selected dates")
+            except ValidationError as e:
+                message = "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors())
+                results.append({"index": index, "status": "rejected", "status_code": 422, "error": message})
+                continue
+            except HTTPException as e:
+                results.append({"index": index, "status": "rejected", "status_code": e.status_code, "error": e.detail})
+                continue
+            
+            price = self._price_booking(details)
+            result = {"index": index, "status": "confirmed", "json": {**details.model_dump(), **price}}
+            if include_summary:
+                result["summary"] = self._booking_summary(details, price)
+            results.append(result)
+            accepted.append((details, result))
+        
+        # One ledger transaction for the whole batch
+        if accepted:
+            try:
+                booking_ids = await self.ledger.append_many([{**result["json"]} for _, result in accepted])
+            except Exception as e:
+                for details, _ in accepted:
+                    self.inventory.release(details.hotel_name, details.check_in, details.check_out)
+                print(f"Booking ledger error: {e}")
+                raise HTTPException(status_code=500, detail="Failed to record bookings")
+            for (_, result), booking_id in zip(accepted, booking_ids):
+                result["json"]["booking_id"] = booking_id
+        
+        return {
+            "results": results,
+            "confirmed": len(accepted),
+            "rejected": len(results) - len(accepted),
+        }
+    
+    async def _confirm_with_llm(self, session_id: str, details: BookingDetails, json_data, summary, on_token=None):
+        """Ask the LLM to confirm the booking; returns the reply, checking the LLM's booking JSON against json_data"""
+        booking_message = (
+            f"User has selected {details.hotel_name} for booking.\n"
+            f"Location: {details.location}\n"
+            f"Check-in: {details.check_in}\n"
+            f"Check-out: {details.check_out}\n"
+            f"Number of guests: {details.guests}\n"
+            f"Guest names: {', '.join(details.guest_names)}\n"
+            f"Phone: {details.phone}\n"
+            f"Please confirm the booking and return the details in the specified JSON format."
+        )
+        self.session_manager.add_message(session_id, "user", booking_message)
+        conversation = self._prompt(session_id)
+        
+        try:
+            self.llm_calls["confirm"] += 1
+            reply = await self._generate_reply(conversation, on_token, temperature=0.7, max_tokens=500)
+        except Exception as e:
+            print(f"Ollama chat error: {e}")
+            return summary
+        
+        llm_json = self._extract_booking_json(reply)
+        if llm_json is None:
+            print("JSON extraction error: no complete booking JSON in response")
+            return reply
+        
+        # The reservation and ledger row use the validated details, so the response must show those too
+        mismatched = [key for key, value in llm_json.items() if value != json_data[key]]
+        if mismatched:
+            self.llm_json_mismatches += 1
+            print(f"LLM booking JSON ignored, it disagrees with the booking on: {', '.join(mismatched)}")
+        return reply
+    
+    def _extract_booking_json(self, text: str):
+        """Return the first complete booking JSON object in text, or None"""
+        decoder = json.JSONDecoder()
+        position = text.find("{")
+        while position != -1:
+            try:
+                candidate, _ = decoder.raw_decode(text, position)
+            except ValueError:
+                candidate = None
+            if isinstance(candidate, dict) and all(key in candidate for key in BOOKING_JSON_KEYS):
+                return {key: candidate[key] for key in BOOKING_JSON_KEYS}
+            position = text.find("{", position + 1)
+        return None
+    
+    def restore_bookings(self):
+        """Replay the booking ledger into the room inventory after a restart"""
+        restored = 0
+        for booking in self.ledger.replay():
+            restored += self.inventory.reserve(booking["hotel_name"], booking["check_in"], booking["check_out"])
+        return restored
+    
+    def get_stats(self):
+        """Per-step counters of LLM calls made and avoided"""
+        return {
+            "llm_calls": dict(self.llm_calls),
+            "llm_calls_avoided": dict(self.llm_calls_avoided),
+            "llm_json_mismatches": self.llm_json_mismatches,
+            "prompt": self.context_builder.get_stats(),
+            "inventory": self.inventory.get_stats(),
+            "ledger": self.ledger.get_stats(),
+        }
\ No newline at end of file
@@ -0,0 +1,103 @@
+import re
+from helper.hotel_service import HOTEL_LISTING_HEADER
+
+# "1. Hotel Gopal – $1800/night" lines of a rendered hotel listing
+LISTED_HOTEL_PATTERN = re.compile(r"^\d+\. (.+?) – \$", re.MULTILINE)
+
+# Per-message overhead of the chat template, in tokens
+MESSAGE_OVERHEAD_TOKENS = 4
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English text, about four characters per token"""
+    return len(text) // 4 + MESSAGE_OVERHEAD_TOKENS
+
+class ContextBuilder:
+    """Fits a session's conversation into a token budget before it is sent to the LLM"""
+
+    def __init__(self, config):
+        self.token_budget = config.get("prompt_token_budget", 1500)
+        self.prompts = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.dropped_messages = 0
+        self.compacted_listings = 0
+
+    def build(self, conversation, session_data, hotel=None):
+        """Return the messages to send: system prompt, booking facts, then the newest turns that fit"""
+        head = [message for message in conversation[:1] if message["role"] == "system"]
+        turns = conversation[len(head):]
+        facts = self._facts(session_data, hotel)
+        if facts:
+            head.append({"role": "system", "content": facts})
+        turns = self._compact_listings(turns)
+
+        budget = self.token_budget - sum(estimate_tokens(message["content"]) for message in head)
+        kept = []
+        for message in reversed(turns):
+            cost = estimate_tokens(message["content"])
+            # The newest message is the one being answered, so it is always kept
+            if kept and cost > budget:
+                break
+            kept.append(message)
+            budget -= cost
+        kept.reverse()
+
+        messages = head + kept
+        self.prompts += 1
+        self.tokens_before += sum(estimate_tokens(message["content"]) for message in conversation)
+        self.tokens_after += sum(estimate_tokens(message["content"]) for message in messages)
+        self.dropped_messages += len(turns) - len(kept)
+        return messages
+
+    def _facts(self, session_data, hotel):
+        """Booking details collected so far, as one short system message"""
+        facts = []
+        if session_data.get("user_location"):
+            facts.append(f"Location: {session_data['user_location']}")
+        if session_data.get("user_dates"):
+            facts.append(f"Requested dates: {' to '.join(day for day in session_data['user_dates'] if day)}")
+        if hotel:
+            facts.append(
+                f"Selected hotel: {hotel['hotel_name']} (${hotel['price_per_night']}/night, up to {hotel['number_of_guests']} guests)"
+            )
+        if session_data.get("check_in"):
+            facts.append(f"Check-in: {session_data['check_in']}")
+        if session_data.get("check_out"):
+            facts.append(f"Check-out: {session_data['check_out']}")
+        if session_data.get("num_guests"):
+            facts.append(f"Guests: {session_data['num_guests']}")
+        if session_data.get("guest_names"):
+            facts.append(f"Guest names: {', '.join(session_data['guest_names'])}")
+        if session_data.get("phone"):
+            facts.append(f"Phone: {session_data['phone']}")
+        if not facts:
+            return None
+        facts.append(f"Current step: {session_data.get('current_step', 'initial')}")
+        return "Booking details collected so far:\n" + "\n".join(facts)
+
+    def _compact_listings(self, turns):
+        """Replace every hotel listing but the latest with the list of hotel names it showed"""
+        listing_positions = [
+            index for index, message in enumerate(turns)
+            if message["role"] == "assistant" and message["content"].startswith(HOTEL_LISTING_HEADER)
+        ]
+        if len(listing_positions) < 2:
+            return turns
+
+        turns = list(turns)
+        for index in listing_positions[:-1]:
+            names = LISTED_HOTEL_PATTERN.findall(turns[index]["content"])
+            turns[index] = {"role": "assistant", "content": f"(Earlier I listed these hotels: {', '.join(names)}.)"}
+            self.compacted_listings += 1
+        return turns
+
+    def get_stats(self):
+        """Average prompt size before and after budgeting"""
+        return {
+            "token_budget": self.token_budget,
+            "prompts": self.prompts,
+            "avg_tokens_before": round(self.tokens_before / self.prompts, 1) if self.prompts else 0,
+            "avg_tokens_after": round(self.tokens_after / self.prompts, 1) if self.prompts else 0,
+            "dropped_messages": self.dropped_messages,
+            "compacted_listings": self.compacted_listings,
+        }
@@ -0,0 +1,129 @@
+import re
+from datetime import date
+from typing import NamedTuple
+
+MONTHS = {name: number for number, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1
+)}
+
+# Group names a date_pattern entry may use
+DATE_FIELDS = (
+    "start", "day", "month", "month_num", "year",
+    "end", "end_day", "end_month", "end_month_num", "end_year",
+)
+
+# Every date the parser understands starts with a digit or a month name; checking that first
+# lets the regex skip ordinary words without trying each pattern at every position
+DATE_START = r"\b(?=\d|" + "|".join(MONTHS) + ")"
+DIGIT = re.compile(r"\d")
+
+class DateRange(NamedTuple):
+    start: date
+    end: date | None
+
+class DateParser:
+    """Finds dates and date ranges in chat messages with one regex compiled from the date_pattern config"""
+
+    def __init__(self, patterns, earliest: date | None = None, latest: date | None = None):
+        # Dates outside [earliest, latest] are skipped like invalid ones
+        self.earliest = earliest
+        self.latest = latest
+        # Named groups are suffixed per pattern so they stay unique in the combined regex,
+        # and each pattern is wrapped in a pN group that lastgroup reports on a match
+        self.pattern_fields = []
+        alternatives = []
+        for index, pattern in enumerate(patterns):
+            names = re.findall(r"\(\?P<(\w+)>", pattern)
+            unknown = set(names) - set(DATE_FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown date pattern groups: {', '.join(sorted(unknown))}")
+            self.pattern_fields.append((tuple(names), tuple(f"{name}_{index}" for name in names)))
+            renamed = re.sub(r"\(\?P<(\w+)>", lambda m: f"(?P<{m.group(1)}_{index}>", pattern)
+            alternatives.append(f"(?P<p{index}>{renamed})")
+        self.regex = re.compile(DATE_START + "(?:" + "|".join(alternatives) + ")", re.IGNORECASE)
+
+    def find(self, message: str, today: date | None = None) -> DateRange | None:
+        """First valid date or date range in the message; end is None for a single date"""
+        # Every date contains a digit, so most chat messages are rejected by this scan alone
+        if not DIGIT.search(message):
+            return None
+        today = today or date.today()
+        start = None
+        for match in self.regex.finditer(message):
+            names, groups = self.pattern_fields[int(match.lastgroup[1:])]
+            fields = {name: match.group(group) for name, group in zip(names, groups)}
+            try:
+                found = self._to_range(fields, today)
+            except ValueError:
+                continue
+            if start is None:
+                if found.end is not None:
+                    return found
+                start = found.start
+                continue
+            # "check in 2030-05-20, checkout 2030-05-25": a later second date ends the stay
+            if found.end is None and found.start > start:
+                return DateRange(start, found.start)
+            break
+        return None if start is None else DateRange(start, None)
+
+    @staticmethod
+    def _month(name, number):
+        """Month number from a name such as "May" or "sept", or from digits"""
+        if number:
+            return int(number)
+        if name:
+            return MONTHS[name[:3].lower()]
+        return None
+
+    @staticmethod
+    def _year(value):
+        """Four-digit year from "2030" or a two-digit "30" in this century"""
+        year = int(value)
+        return 2000 + year if len(value) == 2 else year
+
+    def _to_range(self, fields, today: date) -> DateRange:
+        """Build dates from matched fields, inferring missing months and years; raises ValueError if invalid"""
+        start_month = self._month(fields.get("month"), fields.get("month_num"))
+        end_month = self._month(fields.get("end_month"), fields.get("end_month_num"))
+
+        if fields.get("start"):
+            start = date.fromisoformat(fields["start"])
+        else:
+            month = start_month or end_month
+            if fields.get("year"):
+                start = date(self._year(fields["year"]), month, int(fields["day"]))
+            else:
+                # A date without a year is the next time it comes round
+                start = date(today.year, month, int(fields["day"]))
+                if start < today:
+                    start = date(today.year + 1, month, int(fields["day"]))
+        self._check_bounds(start)
+
+        if fields.get("end"):
+            end = date.fromisoformat(fields["end"])
+        elif fields.get("end_day"):
+            if fields.get("end_year"):
+                end = date(self._year(fields["end_year"]), end_month or start.month, int(fields["end_day"]))
+            elif end_month:
+                # Only a month earlier in the calendar runs into the next year, as in "Dec 28 to Jan 3";
+                # "May 25 to May 20" is rejected below
+                end = date(start.year + (end_month < start.month), end_month, int(fields["end_day"]))
+            else:
+                # "Dec 28 to 3" runs into the following month
+                end = date(start.year, start.month, int(fields["end_day"]))
+                if end <= start:
+                    month = start.month % 12 + 1
+                    end = date(start.year + (month == 1), month, int(fields["end_day"]))
+        else:
+            return DateRange(start, None)
+
+        if end <= start:
+            raise ValueError("Date range must end after it starts")
+        self._check_bounds(end)
+        return DateRange(start, end)
+
+    def _check_bounds(self, day: date):
+        """Raise ValueError for a date outside the parser's bounds"""
+        if (self.earliest and day < self.earliest) or (self.latest and day > self.latest):
+            raise ValueError(f"Dates must be between {self.earliest} and {self.latest}")
@@ -0,0 +1,64 @@
+import numpy as np
+
+SORT_FIELDS = ("price_per_night", "number_of_guests", "hotel_name")
+
+class HotelColumns:
+    """Columnar copy of the hotel catalog for vectorized filtering and sorting"""
+
+    def __init__(self, hotels):
+        count = len(hotels)
+        self.count = count
+        self.price = np.fromiter((hotel["price_per_night"] for hotel in hotels), dtype=np.float64, count=count)
+        self.guests = np.fromiter((hotel["number_of_guests"] for hotel in hotels), dtype=np.int32, count=count)
+
+        # City and state as integer codes; -1 when the location has no such part
+        self.city_codes = {}
+        self.state_codes = {}
+        self.city = np.full(count, -1, dtype=np.int32)
+        self.state = np.full(count, -1, dtype=np.int32)
+        # Parts between city and state, e.g. a district, which have no code column
+        self.uncoded_parts = set()
+        for hotel_id, hotel in enumerate(hotels):
+            parts = [part.strip().lower() for part in hotel["location"].split(",")]
+            if parts and parts[0]:
+                self.city[hotel_id] = self.city_codes.setdefault(parts[0], len(self.city_codes))
+            if len(parts) > 1 and parts[-1]:
+                self.state[hotel_id] = self.state_codes.setdefault(parts[-1], len(self.state_codes))
+            self.uncoded_parts.update(parts[1:-1])
+
+        # Rank of each hotel name, so name ordering is an integer sort
+        names = [hotel["hotel_name"] for hotel in hotels]
+        self.name_rank = np.empty(count, dtype=np.int64)
+        self.name_rank[sorted(range(count), key=names.__getitem__)] = np.arange(count)
+
+    def has_location_code(self, location: str) -> bool:
+        """Whether the city and state code columns find every hotel whose location includes this name"""
+        location = location.strip().lower()
+        return (location in self.city_codes or location in self.state_codes) and location not in self.uncoded_parts
+
+    def query(self, ids=None, location=None, min_price=None, max_price=None, min_guests=None,
+              sort=None, order="asc"):
+        """Return ids of matching hotels, optionally restricted to candidate ids and a city or state, and sorted"""
+        ids = np.arange(self.count) if ids is None else np.asarray(ids, dtype=np.int64)
+
+        mask = np.ones(len(ids), dtype=bool)
+        if location is not None:
+            location = location.strip().lower()
+            mask &= (self.city[ids] == self.city_codes.get(location, -2)) | (self.state[ids] == self.state_codes.get(location, -2))
+        if min_price is not None:
+            mask &= self.price[ids] >= min_price
+        if max_price is not None:
+            mask &= self.price[ids] <= max_price
+        if min_guests is not None:
+            mask &= self.guests[ids] >= min_guests
+        ids = ids[mask]
+
+        if sort:
+            keys = {
+                "price_per_night": self.price,
+                "number_of_guests": self.guests,
+                "hotel_name": self.name_rank,
+            }[sort][ids]
+            # Stable sort on the negated key keeps ties in catalog order, like sorted(reverse=True)
+            ids = ids[np.argsort(-keys if order == "desc" else keys, kind="stable")]
+        return ids
\ No newline at end of file
@@ -1,109 +1,315 @@
-import json
-import os
-from fastapi import HTTPException
-
-class HotelService:
-    def __init__(self, config):
-        self.hotel_json_path = config["hotel_json_path"]
-        self.hotels = self._load_hotels()
-        self.available_location_keywords = self._get_available_locations()
-    
-    def _load_hotels(self):
-        """Load hotel data from JSON file"""
-        try:
-            if not os.path.exists(os.path.dirname(self.hotel_json_path)):
-                os.makedirs(os.path.dirname(self.hotel_json_path))
-            
-            with open(self.hotel_json_path, 'r') as f:
-                hotels = json.load(f)
-            
-            if not isinstance(hotels, list):
-                raise ValueError("Hotel data must be a list of hotel objects")
-            
-            return hotels
-            
-        except Exception as e:
-            print(f"Error loading hotel data: {e}")
-            raise HTTPException(status_code=500, detail=f"Failed to load hotel data: {e}")
-    
-    def _get_available_locations(self):
-        """Extract all unique city and state names from hotel data"""
-        locations_set = set()
-        for hotel in self.hotels:
-            location_parts = hotel["location"].lower().split(",")
-            for part in location_parts:
-                clean = part.strip()
-                if clean:
-                    locations_set.add(clean)
-        return list(locations_set)
-    
-    def extract_location_from_message(self, message: str) -> str | None:
-        """Scalable extraction of location by matching with hotel data locations"""
-        message_lower = message.lower()
-        for keyword in self.available_location_keywords:
-            if keyword in message_lower:
-                return keyword.title()
-        return None
-    
-    def get_hotels_by_location(self, location: str = None):
-        """Get hotels filtered by location"""
-        if not location:
-            return self.hotels
-        
-        filtered_hotels = [
-            hotel for hotel in self.hotels
-            if location.lower() in hotel['location'].lower()
-        ]
-        return filtered_hotels
-    
-    def get_hotel_by_name(self, hotel_name: str):
-        """Get a specific hotel by name"""
-        return next((hotel for hotel in self.hotels if hotel['hotel_name'] == hotel_name), None)
-    
-    def get_all_hotels(self):
-        """Get all hotels"""
-        return self.hotels
-    
-    def format_hotel_list(self, location=None):
-        """Format hotel list for display"""
-        filtered_hotels = self.get_hotels_by_location(location)
-        
-        if not filtered_hotels:
-            return f"Sorry, we don't have any hotels available in {location}. Please try a different location like Dwarka, Ahmedabad, Vadodara, Rajkot, or other major cities."
-        
-        formatted_list = "Fantastic! Here are some available hotel options that match your requirements:\n\n"
-        
-        for idx, hotel in enumerate(filtered_hotels, 1):
-            formatted_list += f"{idx}. {hotel['hotel_name']} – ${hotel['price_per_night']}/night\n"
-            formatted_list += f"    Location: {hotel['location']}\n"
-            formatted_list += f"    Capacity: Up to {hotel['number_of_guests']} guests\n"
-            
-            description = hotel.get("description", "").strip()
-            first_sentence = description.split(".")[0].strip() if description else "No description available"
-            formatted_list += f"    {first_sentence}. "
-            
-            # Determine room type
-            if "single" in description.lower():
-                formatted_list += "This single room features:\n"
-            elif "double" in description.lower() or "twin" in hotel["hotel_name"].lower():
-                formatted_list += "This double room offers:\n"
-            elif "suite" in hotel["hotel_name"].lower():
-                formatted_list += "This suite includes:\n"
-            else:
-                formatted_list += "This room includes:\n"
-            
-            # Add bullet points
-            bullets = []
-            if hotel.get("amenities"):
-                bullets.extend(hotel["amenities"][:3])
-            if len(bullets) < 3 and hotel.get("facilities"):
-                bullets.extend(hotel["facilities"][:3 - len(bullets)])
-            if not bullets:
-                bullets = ["Modern furnishings", "Great location", "Exceptional service"]
-            
-            for bullet in bullets:
-                formatted_list += f"    - {bullet}\n"
-            formatted_list += "\n"
-        
-        formatted_list += "Which hotel would you like to choose?"
-        return formatted_list
\ No newline at end of file
+import json
+import os
+import time
+import asyncio
+from fastapi import HTTPException
+from helper.location_matcher import LocationMatcher
+from helper.hotel_columns import HotelColumns, SORT_FIELDS
+
+HOTEL_LISTING_HEADER = "Fantastic! Here are some available hotel options that match your requirements:\n\n"
+
+class HotelCatalog:
+    """Hotel list plus every index derived from it, swapped in as one unit on reload; the whole catalog stays in memory"""
+
+    def __init__(self, hotels, max_cached_listings=1024):
+        self.hotels = hotels
+        self.max_cached_listings = max_cached_listings
+        self._build_indexes()
+        self.available_location_keywords, broader = self._get_available_locations()
+        self.location_matcher = LocationMatcher(self.available_location_keywords, broader)
+        self.columns = HotelColumns(hotels)
+
+    def _build_indexes(self):
+        """Build hotel-name and location -> hotel-id lookups"""
+        self.hotels_by_name = {}
+        self.hotel_ids_by_name = {}
+        self.location_index = {}
+        for hotel_id, hotel in enumerate(self.hotels):
+            self.hotels_by_name.setdefault(hotel["hotel_name"], hotel)
+            self.hotel_ids_by_name.setdefault(hotel["hotel_name"], hotel_id)
+
+            # Index the full location string as well as its city and state parts
+            location = hotel["location"].lower().strip()
+            keys = {location} | {part.strip() for part in location.split(",") if part.strip()}
+            for key in keys:
+                self.location_index.setdefault(key, []).append(hotel_id)
+
+        # Pre-rendered listing blocks; rendered lists are memoized per location
+        self.hotel_blocks = [self._render_hotel_block(hotel) for hotel in self.hotels]
+        self.listing_cache = {}
+
+    def _get_available_locations(self):
+        """Extract all unique city and state names from hotel data, and the broader parts listed after each"""
+        locations_set = set()
+        broader = {}
+        for hotel in self.hotels:
+            location_parts = [part.strip() for part in hotel["location"].lower().split(",") if part.strip()]
+            for index, part in enumerate(location_parts):
+                locations_set.add(part)
+                broader.setdefault(part, set()).update(location_parts[index + 1:])
+        return list(locations_set), broader
+
+    def get_hotel_ids_by_location(self, location: str = None):
+        """Get ids of hotels matching a location"""
+        if not location:
+            return list(range(len(self.hotels)))
+
+        hotel_ids = self.location_index.get(location.lower().strip())
+        if hotel_ids is not None:
+            return hotel_ids
+
+        # Partial location names fall back to a substring scan
+        return [
+            hotel_id for hotel_id, hotel in enumerate(self.hotels)
+            if location.lower() in hotel['location'].lower()
+        ]
+
+    def query(self, location=None, min_price=None, max_price=None, min_guests=None,
+              sort=None, order="asc", limit=50, offset=0):
+        """Return (total, hotels) for one page of hotels matching the filters"""
+        filters = dict(min_price=min_price, max_price=max_price, min_guests=min_guests, sort=sort, order=order)
+        if not location:
+            hotel_ids = self.columns.query(**filters)
+        elif self.columns.has_location_code(location):
+            # City and state names filter on the integer code columns
+            hotel_ids = self.columns.query(location=location, **filters)
+        else:
+            # Full location strings and partial names go through the location index
+            hotel_ids = self.columns.query(ids=self.get_hotel_ids_by_location(location), **filters)
+        page = hotel_ids[offset:offset + limit].tolist()
+        return len(hotel_ids), [self.hotels[hotel_id] for hotel_id in page]
+
+    def _render_hotel_block(self, hotel):
+        """Render one hotel's listing entry, without its list number"""
+        description = (hotel.get("description") or "").strip()
+        description_lower = description.lower()
+        hotel_name_lower = hotel["hotel_name"].lower()
+        first_sentence = description.split(".")[0].strip() if description else "No description available"
+
+        # Determine room type
+        if "single" in description_lower:
+            room_type = "This single room features:"
+        elif "double" in description_lower or "twin" in hotel_name_lower:
+            room_type = "This double room offers:"
+        elif "suite" in hotel_name_lower:
+            room_type = "This suite includes:"
+        else:
+            room_type = "This room includes:"
+
+        # Add bullet points
+        bullets = []
+        if hotel.get("amenities"):
+            bullets.extend(hotel["amenities"][:3])
+        if len(bullets) < 3 and hotel.get("facilities"):
+            bullets.extend(hotel["facilities"][:3 - len(bullets)])
+        if not bullets:
+            bullets = ["Modern furnishings", "Great location", "Exceptional service"]
+
+        lines = [
+            f"{hotel['hotel_name']} – ${hotel['price_per_night']}/night",
+            f"    Location: {hotel['location']}",
+            f"    Capacity: Up to {hotel['number_of_guests']} guests",
+            f"    {first_sentence}. {room_type}",
+        ]
+        lines.extend(f"    - {bullet}" for bullet in bullets)
+        return "\n".join(lines) + "\n\n"
+
+    def format_hotel_list(self, location=None, available=None, quote=None, variant=None):
+        """Format hotel list for display, filtered by the available predicate and priced by quote if given"""
+        # Filtered or priced lists are memoized only under a variant key that identifies the filter and quote
+        if (available is not None or quote is not None) and variant is None:
+            return self._render_hotel_list(location, available, quote)
+        
+        key = (location, variant)
+        formatted_list = self.listing_cache.get(key)
+        if formatted_list is None:
+            formatted_list = self._render_hotel_list(location, available, quote)
+            if len(self.listing_cache) >= self.max_cached_listings:
+                self.listing_cache.clear()
+            self.listing_cache[key] = formatted_list
+        return formatted_list
+
+    def _render_hotel_list(self, location=None, available=None, quote=None):
+        """Assemble the hotel list reply from the pre-rendered hotel blocks"""
+        hotel_ids = self.get_hotel_ids_by_location(location)
+        if available is not None:
+            hotel_ids = [hotel_id for hotel_id in hotel_ids if available(self.hotels[hotel_id])]
+
+        if not hotel_ids:
+            return f"Sorry, we don't have any hotels available in {location}. Please try a different location like Dwarka, Ahmedabad, Vadodara, Rajkot, or other major cities."
+
+        parts = [HOTEL_LISTING_HEADER]
+        if quote is None:
+            for idx, hotel_id in enumerate(hotel_ids, 1):
+                parts.append(f"{idx}. {self.hotel_blocks[hotel_id]}")
+        else:
+            # Totals for every listed hotel come from one vectorized quote
+            stay = quote(self, hotel_ids)
+            for idx, (hotel_id, total) in enumerate(zip(hotel_ids, stay["total"].tolist()), 1):
+                parts.append(f"{idx}. {self.hotel_blocks[hotel_id][:-1]}    Total for {stay['nights']} nights: ${total:.2f} incl. tax\n\n")
+        parts.append("Which hotel would you like to choose?")
+        return "".join(parts)
+
+class HotelService:
+    def __init__(self, config):
+        self.hotel_json_path = config["hotel_json_path"]
+        self.max_cached_listings = config.get("hotel_listing_cache_size", 1024)
+        self.reload_interval = config.get("hotel_reload_interval", 5.0)
+        self.reload_count = 0
+        self.reload_failures = 0
+        self.last_reload_seconds = None
+        self.last_reload_at = None
+        self._file_signature = None
+        self._watch_task = None
+        self.catalog = self._load_catalog()
+
+    @property
+    def hotels(self):
+        return self.catalog.hotels
+
+    def _load_hotels(self):
+        """Load hotel data from JSON file"""
+        try:
+            if not os.path.exists(os.path.dirname(self.hotel_json_path)):
+                os.makedirs(os.path.dirname(self.hotel_json_path))
+
+            return self._read_hotels()
+
+        except Exception as e:
+            print(f"Error loading hotel data: {e}")
+            raise HTTPException(status_code=500, detail=f"Failed to load hotel data: {e}")
+
+    def _read_hotels(self):
+        """Read and validate hotel.json, recording the file signature it was read at"""
+        signature = self._current_signature()
+        with open(self.hotel_json_path, 'r') as f:
+            hotels = json.load(f)
+
+        if not isinstance(hotels, list):
+            raise ValueError("Hotel data must be a list of hotel objects")
+        for idx, hotel in enumerate(hotels):
+            if not isinstance(hotel, dict):
+                raise ValueError(f"Hotel entry {idx} must be an object")
+            if not isinstance(hotel.get("hotel_name"), str) or not isinstance(hotel.get("location"), str):
+                raise ValueError(f"Hotel entry {idx} must have a hotel_name and location")
+            if not isinstance(hotel.get("price_per_night"), (int, float)) or not isinstance(hotel.get("number_of_guests"), int):
+                raise ValueError(f"Hotel entry {idx} must have a numeric price_per_night and number_of_guests")
+
+        self._file_signature = signature
+        return hotels
+
+    def _build_catalog(self, hotels):
+        """Build the in-memory indexes"""
+        return HotelCatalog(hotels, self.max_cached_listings)
+
+    def _load_catalog(self):
+        """Load hotel data and build its indexes"""
+        return self._build_catalog(self._load_hotels())
+
+    def _current_signature(self):
+        """Modification time and size of hotel.json, or None if it is missing"""
+        try:
+            stat = os.stat(self.hotel_json_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _hotels_file_changed(self):
+        """Check whether hotel.json differs from the version last loaded"""
+        signature = self._current_signature()
+        return signature is not None and signature != self._file_signature
+
+    async def reload_hotels(self):
+        """Rebuild the catalog off the event loop and swap it in atomically"""
+        started = time.perf_counter()
+        try:
+            catalog = await asyncio.to_thread(
+                lambda: self._build_catalog(self._read_hotels())
+            )
+        except Exception as e:
+            # Keep serving the previous catalog and skip this version of the file
+            self._file_signature = self._current_signature()
+            self.reload_failures += 1
+            print(f"Hotel reload error: {e}")
+            return False
+
+        # Single attribute assignment: readers see either the old or the new catalog
+        self.catalog = catalog
+        self.reload_count += 1
+        self.last_reload_seconds = time.perf_counter() - started
+        self.last_reload_at = time.time()
+        return True
+
+    async def watch_hotels(self):
+        """Poll hotel.json and reload when it changes"""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            if self._hotels_file_changed():
+                await self.reload_hotels()
+
+    def start_watcher(self):
+        """Start the background hotel.json watcher"""
+        if self.reload_interval and self._watch_task is None:
+            self._watch_task = asyncio.create_task(self.watch_hotels())
+
+    def stop_watcher(self):
+        """Stop the background hotel.json watcher"""
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            self._watch_task = None
+
+    def extract_location_from_message(self, message: str) -> str | None:
+        """Scalable extraction of location by matching with hotel data locations"""
+        keyword = self.catalog.location_matcher.find(message)
+        return keyword.title() if keyword else None
+
+    def get_hotels_by_location(self, location: str = None, available=None):
+        """Get hotels filtered by location, and by the available predicate if given"""
+        catalog = self.catalog
+        if not location and available is None:
+            return catalog.hotels
+        hotels = [catalog.hotels[hotel_id] for hotel_id in catalog.get_hotel_ids_by_location(location)]
+        if available is not None:
+            hotels = [hotel for hotel in hotels if available(hotel)]
+        return hotels
+
+    def get_hotel_by_name(self, hotel_name: str):
+        """Get a specific hotel by name"""
+        return self.catalog.hotels_by_name.get(hotel_name)
+
+    def get_all_hotels(self):
+        """Get all hotels"""
+        return self.catalog.hotels
+
+    def format_hotel_list(self, location=None, available=None, quote=None, variant=None):
+        """Format hotel list for display"""
+        return self.catalog.format_hotel_list(location, available, quote, variant)
+
+    def query_hotels(self, location=None, min_price=None, max_price=None, min_guests=None,
+                     sort=None, order="asc", limit=50, offset=0, fields=None):
+        """Filtered, sorted and paginated hotel query with optional field projection; only the response size is bounded"""
+        if sort and sort not in SORT_FIELDS:
+            raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(SORT_FIELDS)}")
+        if order not in ("asc", "desc"):
+            raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
+        
+        total, hotels = self.catalog.query(
+            location=location, min_price=min_price, max_price=max_price, min_guests=min_guests,
+            sort=sort, order=order, limit=limit, offset=offset
+        )
+        
+        if fields:
+            wanted = [field.strip() for field in fields.split(",") if field.strip()]
+            hotels = [{field: hotel[field] for field in wanted if field in hotel} for hotel in hotels]
+        
+        return {"hotels": hotels, "total": total, "limit": limit, "offset": offset}
+
+    def get_stats(self):
+        """Catalog size and reload metrics"""
+        return {
+            "hotel_count": len(self.catalog.hotels),
+            "reload_count": self.reload_count,
+            "reload_failures": self.reload_failures,
+            "last_reload_seconds": self.last_reload_seconds,
+            "last_reload_at": self.last_reload_at,
+        }
\ No newline at end of file
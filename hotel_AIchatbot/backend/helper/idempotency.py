@@ -0,0 +1,58 @@
+import time
+import asyncio
+from collections import OrderedDict
+
+class IdempotencyCache:
+    """Bounded TTL cache of completed responses that also coalesces concurrent duplicates"""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.in_flight = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    async def run(self, key: str, compute):
+        """Return the stored response for key, join its in-flight computation, or start compute()"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            expires_at, response = entry
+            if expires_at > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return response
+            del self.entries[key]
+
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.create_task(compute())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        # A client that goes away must not cancel the work other retries are waiting on
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task):
+        """Store a successful result; failures are not cached so a retry recomputes"""
+        self.in_flight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        self.entries[key] = (time.monotonic() + self.ttl, task.result())
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get_stats(self):
+        """Cache hit, coalesce and size counters"""
+        return {
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "entries": len(self.entries),
+            "in_flight": len(self.in_flight),
+        }
\ No newline at end of file
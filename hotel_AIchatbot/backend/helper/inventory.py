@@ -0,0 +1,73 @@
+from datetime import date, datetime
+
+# Stays must fall within these dates, which caps a hotel's bitmap at about 4.5 KB
+FIRST_DATE = date(2000, 1, 1)
+LAST_DATE = date(2099, 12, 31)
+
+# Bit n of a hotel's bitmap is the night starting on EPOCH + n days
+EPOCH = FIRST_DATE.toordinal()
+
+def _to_date(value) -> date:
+    """Accept a date or a YYYY-MM-DD string"""
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+class RoomInventory:
+    """Booked nights per hotel, kept as one day-bitmap per hotel name"""
+
+    def __init__(self):
+        self.booked_nights = {}
+        self.booking_count = 0
+        # Bumped on every change, so results derived from availability can be cached per version
+        self.version = 0
+
+    @staticmethod
+    def _night_range(check_in, check_out):
+        """Return (first night offset, number of nights) for a stay"""
+        check_in, check_out = _to_date(check_in), _to_date(check_out)
+        if check_in < FIRST_DATE or check_out > LAST_DATE:
+            raise ValueError(f"Dates must be between {FIRST_DATE} and {LAST_DATE}")
+        return check_in.toordinal() - EPOCH, (check_out - check_in).days
+
+    def is_available(self, hotel_name: str, check_in, check_out) -> bool:
+        """Check that every night of the stay is free; cost does not grow with the number of bookings"""
+        start, nights = self._night_range(check_in, check_out)
+        return self._is_free(hotel_name, start, nights)
+
+    def _is_free(self, hotel_name: str, start: int, nights: int) -> bool:
+        """Check the nights [start, start + nights) against the hotel's bitmap"""
+        if nights <= 0:
+            return False
+        bitmap = self.booked_nights.get(hotel_name, 0)
+        return not (bitmap >> start) & ((1 << nights) - 1)
+
+    def reserve(self, hotel_name: str, check_in, check_out) -> bool:
+        """Mark the stay's nights as booked; returns False if any night is taken"""
+        start, nights = self._night_range(check_in, check_out)
+        if not self._is_free(hotel_name, start, nights):
+            return False
+        self.booked_nights[hotel_name] = self.booked_nights.get(hotel_name, 0) | (((1 << nights) - 1) << start)
+        self.booking_count += 1
+        self.version += 1
+        return True
+
+    def release(self, hotel_name: str, check_in, check_out):
+        """Free the stay's nights, e.g. when a booking could not be completed"""
+        start, nights = self._night_range(check_in, check_out)
+        if nights > 0 and hotel_name in self.booked_nights:
+            self.booked_nights[hotel_name] &= ~(((1 << nights) - 1) << start)
+            self.booking_count -= 1
+            self.version += 1
+
+    def availability_filter(self, check_in, check_out):
+        """Predicate keeping only hotels free for every night of the stay"""
+        start, nights = self._night_range(check_in, check_out)
+        return lambda hotel: self._is_free(hotel["hotel_name"], start, nights)
+
+    def get_stats(self):
+        """Inventory size counters"""
+        return {
+            "bookings": self.booking_count,
+            "hotels_with_bookings": len(self.booked_nights),
+        }
\ No newline at end of file
@@ -0,0 +1,46 @@
+import re
+
+class LocationMatcher:
+    """Precompiled word-boundary matcher over a set of location keywords"""
+
+    def __init__(self, keywords, broader=None):
+        self.keywords = sorted({keyword.strip().lower() for keyword in keywords if keyword and keyword.strip()})
+        # keyword -> keywords of the regions containing it, e.g. "dwarka" -> {"gujarat"}
+        self.broader = broader or {}
+        self.pattern = self._compile(self.keywords)
+
+    @classmethod
+    def _compile(cls, keywords):
+        """Compile keywords into one trie-shaped alternation, so matching cost does not grow with the keyword count"""
+        if not keywords:
+            return re.compile(r"(?!)")
+
+        trie = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = True
+
+        return re.compile(r"\b" + cls._trie_pattern(trie) + r"\b")
+
+    @classmethod
+    def _trie_pattern(cls, node):
+        """Regex for a trie node; optional tails are greedy so longer keywords are tried first"""
+        branches = [re.escape(char) + cls._trie_pattern(node[char]) for char in sorted(node) if char]
+        if not branches:
+            return ""
+
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            pattern = "(?:" + pattern + ")?"
+        return pattern
+
+    def find(self, message: str) -> str | None:
+        """Return the first whole-word location keyword in the message, or a later one inside it, such as its city"""
+        found = None
+        for match in self.pattern.finditer(message.lower()):
+            keyword = match.group(0)
+            if found is None or found in self.broader.get(keyword, ()):
+                found = keyword
+        return found
\ No newline at end of file
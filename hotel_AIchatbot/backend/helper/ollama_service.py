@@ -1,31 +1,88 @@
-import requests
-from fastapi import HTTPException
-
-class OllamaService:
-    def __init__(self, config):
-        self.ollama_host = config["ollama_host"]
-        self.ollama_model = config["ollama_model"]
-    
-    def chat(self, messages, temperature=0.7, max_tokens=700):
-        """Interact with Ollama API"""
-        try:
-            payload = {
-                "model": self.ollama_model,
-                "messages": messages,
-                "temperature": temperature,
-                "max_tokens": max_tokens,
-                "stream": False
-            }
-            
-            response = requests.post(f"{self.ollama_host}/api/chat", json=payload)
-            response.raise_for_status()
-            result = response.json()
-            
-            if "message" not in result or "content" not in result["message"]:
-                raise ValueError("Unexpected Ollama response format")
-            
-            return result["message"]["content"].strip()
-            
-        except requests.RequestException as e:
-            print(f"Ollama chat error: {e}")
+import json
+import httpx
+from fastapi import HTTPException
+
+class OllamaService:
+    def __init__(self, config):
+        self.ollama_host = config["ollama_host"]
+        self.ollama_model = config["ollama_model"]
+        self.timeout = httpx.Timeout(
+            config.get("ollama_timeout", 120.0),
+            connect=config.get("ollama_connect_timeout", 5.0)
+        )
+        self.limits = httpx.Limits(
+            max_connections=config.get("ollama_max_connections", 20),
+            max_keepalive_connections=config.get("ollama_max_keepalive", 10),
+            keepalive_expiry=config.get("ollama_keepalive_expiry", 60.0)
+        )
+        self._client = None
+
+    @property
+    def client(self):
+        """Shared keep-alive connection pool, created on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.ollama_host,
+                timeout=self.timeout,
+                limits=self.limits
+            )
+        return self._client
+
+    async def close(self):
+        """Close the pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def chat(self, messages, temperature=0.7, max_tokens=700):
+        """Interact with Ollama API"""
+        try:
+            payload = {
+                "model": self.ollama_model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "stream": False
+            }
+
+            response = await self.client.post("/api/chat", json=payload)
+            response.raise_for_status()
+            result = response.json()
+
+            if "message" not in result or "content" not in result["message"]:
+                raise ValueError("Unexpected Ollama response format")
+
+            return result["message"]["content"].strip()
+
+        except httpx.HTTPError as e:
+            print(f"Ollama chat error: {e}")
+            raise HTTPException(status_code=500, detail=f"Ollama chat error: {e}")
+
+    async def chat_stream(self, messages, temperature=0.7, max_tokens=700):
+        """Interact with Ollama API in stream mode, yielding tokens as they arrive"""
+        try:
+            payload = {
+                "model": self.ollama_model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "stream": True
+            }
+
+            async with self.client.stream("POST", "/api/chat", json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if "error" in chunk:
+                        raise ValueError(chunk["error"])
+                    token = chunk.get("message", {}).get("content", "")
+                    if token:
+                        yield token
+                    if chunk.get("done"):
+                        break
+
+        except httpx.HTTPError as e:
+            print(f"Ollama chat error: {e}")
             raise HTTPException(status_code=500, detail=f"Ollama chat error: {e}")
\ No newline at end of file
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+import numpy as np
+from fastapi import HTTPException
+
+class PricingRules:
+    """Tax rate and per-night price overrides loaded from the pricing section of config.json"""
+
+    def __init__(self, config):
+        pricing = config.get("pricing", {})
+        self.tax_rate = pricing.get("tax_rate", 0.15)
+        # hotel name -> {date: price for that night}
+        self.nightly_overrides = {
+            hotel_name: {datetime.strptime(night, "%Y-%m-%d").date(): price for night, price in nights.items()}
+            for hotel_name, nights in pricing.get("nightly_overrides", {}).items()
+        }
+
+class QuoteEngine:
+    """Prices a stay for many hotels at once from the catalog's columnar store"""
+
+    def __init__(self, hotel_service, rules: PricingRules):
+        self.hotel_service = hotel_service
+        self.rules = rules
+
+    @staticmethod
+    def _stay(check_in: str, check_out: str):
+        """Parse a stay, returning (check-in date, number of nights)"""
+        try:
+            check_in_date = datetime.strptime(check_in, "%Y-%m-%d").date()
+            check_out_date = datetime.strptime(check_out, "%Y-%m-%d").date()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+        nights = (check_out_date - check_in_date).days
+        if nights <= 0:
+            raise HTTPException(status_code=400, detail="Check-out date must be after check-in date")
+        return check_in_date, nights
+
+    def quote_ids(self, catalog, hotel_ids, check_in: str, check_out: str):
+        """Vectorized subtotal, tax and total for the given hotel ids"""
+        check_in_date, nights = self._stay(check_in, check_out)
+        hotel_ids = np.asarray(hotel_ids, dtype=np.int64)
+        subtotal = catalog.columns.price[hotel_ids] * nights
+
+        # Overrides are sparse, so adjust only the overridden hotels present in this quote
+        stay_nights = [check_in_date + timedelta(days=offset) for offset in range(nights)]
+        for hotel_name, overrides in self.rules.nightly_overrides.items():
+            hotel = catalog.hotels_by_name.get(hotel_name)
+            positions = np.nonzero(hotel_ids == catalog.hotel_ids_by_name.get(hotel_name, -1))[0]
+            if hotel is None or not len(positions):
+                continue
+            subtotal[positions] += sum(
+                overrides[night] - hotel["price_per_night"] for night in stay_nights if night in overrides
+            )
+
+        tax = np.round(subtotal * self.rules.tax_rate, 2)
+        return {
+            "hotel_ids": hotel_ids,
+            "nights": nights,
+            "subtotal": subtotal,
+            "tax": tax,
+            "total": subtotal + tax,
+        }
+
+    def quote_hotel(self, hotel_name: str, check_in: str, check_out: str):
+        """Price breakdown for one hotel"""
+        catalog = self.hotel_service.catalog
+        quote = self.quote_ids(catalog, [catalog.hotel_ids_by_name[hotel_name]], check_in, check_out)
+        return {
+            "nights": quote["nights"],
+            "price_per_night": catalog.hotels_by_name[hotel_name]["price_per_night"],
+            "subtotal": round(float(quote["subtotal"][0]), 2),
+            "tax": float(quote["tax"][0]),
+            "total": round(float(quote["total"][0]), 2),
+        }
+
+    def quote(self, check_in: str, check_out: str, location=None, hotel_names=None, limit=50, offset=0):
+        """Quote every hotel matching a location or list of names, cheapest first"""
+        catalog = self.hotel_service.catalog
+        if hotel_names:
+            hotel_ids = [catalog.hotel_ids_by_name[name] for name in hotel_names if name in catalog.hotel_ids_by_name]
+        else:
+            hotel_ids = catalog.get_hotel_ids_by_location(location)
+
+        quote = self.quote_ids(catalog, hotel_ids, check_in, check_out)
+        order = np.argsort(quote["total"], kind="stable")[offset:offset + limit]
+        quotes = [
+            {
+                "hotel_name": catalog.hotels[hotel_id]["hotel_name"],
+                "location": catalog.hotels[hotel_id]["location"],
+                "price_per_night": catalog.hotels[hotel_id]["price_per_night"],
+                "subtotal": round(subtotal, 2),
+                "tax": tax,
+                "total": round(total, 2),
+            }
+            for hotel_id, subtotal, tax, total in zip(
+                quote["hotel_ids"][order].tolist(),
+                quote["subtotal"][order].tolist(),
+                quote["tax"][order].tolist(),
+                quote["total"][order].tolist(),
+            )
+        ]
+        return {
+            "check_in": check_in,
+            "check_out": check_out,
+            "nights": quote["nights"],
+            "quotes": quotes,
+            "total": len(quote["hotel_ids"]),
+            "limit": limit,
+            "offset": offset,
+        }
\ No newline at end of file
@@ -1,71 +1,248 @@
-class SessionManager:
-    def __init__(self):
-        self.sessions = {}
-        self.session_data = {}
-        self.system_prompt = """
-You are a hotel booking assistant for a hotel. Follow this flow:
-1. Welcome the user and ask for their hotel booking requirements (e.g., location and dates).
-2. When the user mentions BOTH a location AND dates (e.g., "I need a hotel in Gujarat from May 20 to May 25"), respond with available hotel options. DO NOT show hotels unless BOTH location and dates are mentioned together.
-3. Once the user selects a hotel by mentioning its name, confirm the selection and start collecting booking details one at a time:
-   - First, ask for the check-in date (format: YYYY-MM-DD). If the user provides it, confirm and proceed.
-   - Next, ask for the check-out date (format: YYYY-MM-DD). If provided, confirm and proceed.
-   - Then, ask for the number of guests. If provided, confirm and proceed. Ensure the number of guests does not exceed the hotel's capacity.
-   - Then, ask for the guest names (one name at a time, e.g., "John Doe", then "Jane Smith"). Collect names based on the number of guests.
-   - Finally, ask for the phone number (format: XXX-XXX-XXXX). If provided, confirm and proceed.
-4. After collecting each detail, confirm it and ask for the next one. If the user provides an invalid format, ask them to provide it again in the correct format.
-5. Once all details are collected, give a summary of the booking details and ask for confirmation.
-
-IMPORTANT: Only show hotel options when BOTH location AND dates are mentioned in the same message or conversation context.
-"""
-    
-    def initialize_session(self, session_id: str):
-        """Initialize a new session"""
-        if session_id not in self.sessions:
-            self.sessions[session_id] = [{"role": "system", "content": self.system_prompt}]
-            self.session_data[session_id] = {
-                "selected_hotel": None,
-                "selected_hotel_details": None,
-                "check_in": None,
-                "check_out": None,
-                "num_guests": None,
-                "guest_names": [],
-                "phone": None,
-                "current_step": "initial",
-                "user_location": None,
-                "user_dates": None,
-                "image_sent": False
-            }
-    
-    def get_session(self, session_id: str):
-        """Get session conversation history"""
-        self.initialize_session(session_id)
-        return self.sessions[session_id]
-    
-    def get_session_data(self, session_id: str):
-        """Get session data"""
-        self.initialize_session(session_id)
-        return self.session_data[session_id]
-    
-    def add_message(self, session_id: str, role: str, content: str):
-        """Add a message to the session"""
-        self.initialize_session(session_id)
-        self.sessions[session_id].append({"role": role, "content": content})
-    
-    def update_session_data(self, session_id: str, key: str, value):
-        """Update session data"""
-        self.initialize_session(session_id)
-        self.session_data[session_id][key] = value
-    
-    def reset_last_message(self, session_id: str):
-        """Reset the last message in the session"""
-        if session_id in self.sessions:
-            conversation = self.sessions[session_id]
-            if len(conversation) >= 2:
-                conversation = conversation[:-2]
-                self.sessions[session_id] = conversation
-                return {"status": "Last user-bot message deleted successfully"}
-            else:
-                self.sessions[session_id] = []
-                return {"status": "Conversation cleared (less than 2 messages)"}
-        else:
-            return {"status": "Session not found"}, 404
\ No newline at end of file
+import time
+import weakref
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from helper.session_store import get_session_store
+
+SYSTEM_PROMPT = """
+You are a hotel booking assistant for a hotel. Follow this flow:
+1. Welcome the user and ask for their hotel booking requirements (e.g., location and dates).
+2. When the user mentions BOTH a location AND dates (e.g., "I need a hotel in Gujarat from May 20 to May 25"), respond with available hotel options. DO NOT show hotels unless BOTH location and dates are mentioned together.
+3. Once the user selects a hotel by mentioning its name, confirm the selection and start collecting booking details one at a time:
+   - First, ask for the check-in date (format: YYYY-MM-DD). If the user provides it, confirm and proceed.
+   - Next, ask for the check-out date (format: YYYY-MM-DD). If provided, confirm and proceed.
+   - Then, ask for the number of guests. If provided, confirm and proceed. Ensure the number of guests does not exceed the hotel's capacity.
+   - Then, ask for the guest names (one name at a time, e.g., "John Doe", then "Jane Smith"). Collect names based on the number of guests.
+   - Finally, ask for the phone number (format: XXX-XXX-XXXX). If provided, confirm and proceed.
+4. After collecting each detail, confirm it and ask for the next one. If the user provides an invalid format, ask them to provide it again in the correct format.
+5. Once all details are collected, give a summary of the booking details and ask for confirmation.
+
+IMPORTANT: Only show hotel options when BOTH location AND dates are mentioned in the same message or conversation context.
+"""
+
+@dataclass(slots=True)
+class SessionState:
+    """One chat session: history as (role, content) tuples plus the booking details collected so far"""
+    history: list = field(default_factory=list)
+    current_step: str = "initial"
+    user_location: str | None = None
+    # [start, end] ISO dates from the first message; end is None for a single date
+    user_dates: list | None = None
+    # Catalog entry referenced by name, which stays valid across catalog reloads
+    selected_hotel: str | None = None
+    check_in: str | None = None
+    check_out: str | None = None
+    num_guests: int | None = None
+    guest_names: list = field(default_factory=list)
+    phone: str | None = None
+    image_sent: bool = False
+
+    # Mapping-style access, so booking steps can use session["check_in"]
+    def __getitem__(self, key):
+        """Read a field by name"""
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        """Set a field by name"""
+        setattr(self, key, value)
+
+    def get(self, key, default=None):
+        """Read a field by name, or default if there is no such field"""
+        return getattr(self, key, default)
+
+    def details(self):
+        """Booking details without the history, for serialization"""
+        return {name: getattr(self, name) for name in self.__slots__ if name != "history"}
+
+class SessionManager:
+    def __init__(self, config):
+        self.sessions = {}
+        self.session_ttl = config.get("session_ttl_seconds", 1800.0)
+        self.max_sessions = config.get("session_max_count", 10000)
+        self.sweep_interval = config.get("session_sweep_interval", 60.0)
+        # Least recently used first; session id -> last access time
+        self.last_access = OrderedDict()
+        # Approximate bytes of message content held per session
+        self.session_bytes = {}
+        self.total_bytes = 0
+        self.expired = 0
+        self.evicted = 0
+        self._sweep_task = None
+        # Sessions touched or dropped since the last snapshot, tracked once snapshots are enabled
+        self.track_changes = False
+        self.dirty = set()
+        self.dropped = set()
+        # With a persistent backend the dicts above are working copies of the stored sessions
+        self.store = get_session_store(config)
+        # A session's lock disappears once no request holds or waits on it
+        self.session_locks = weakref.WeakValueDictionary()
+        self.lock_waits = 0
+    
+    def initialize_session(self, session_id: str):
+        """Initialize a new session"""
+        if self.track_changes:
+            self.dirty.add(session_id)
+        if session_id in self.sessions:
+            self.last_access[session_id] = time.monotonic()
+            self.last_access.move_to_end(session_id)
+        else:
+            self._make_room()
+            self.last_access[session_id] = time.monotonic()
+            self.sessions[session_id] = SessionState()
+            self.session_bytes[session_id] = 0
+    
+    def _make_room(self):
+        """Drop the least recently used sessions until a new one fits"""
+        while len(self.sessions) >= self.max_sessions:
+            self.drop_session(next(iter(self.last_access)))
+            self.evicted += 1
+    
+    def restore_session(self, session_id: str, state: SessionState):
+        """Add a session recovered from a snapshot, without marking it for the next snapshot"""
+        if session_id not in self.sessions:
+            self._make_room()
+        self.sessions[session_id] = state
+        self.last_access[session_id] = time.monotonic()
+        self.last_access.move_to_end(session_id)
+        self._track_bytes(session_id)
+    
+    def get_session(self, session_id: str):
+        """Get session conversation history as chat messages, starting with the shared system prompt"""
+        self.initialize_session(session_id)
+        return [{"role": "system", "content": SYSTEM_PROMPT}] + [
+            {"role": role, "content": content} for role, content in self.sessions[session_id].history
+        ]
+    
+    def get_session_data(self, session_id: str):
+        """Get session data"""
+        self.initialize_session(session_id)
+        return self.sessions[session_id]
+    
+    def add_message(self, session_id: str, role: str, content: str):
+        """Add a message to the session"""
+        self.initialize_session(session_id)
+        self.sessions[session_id].history.append((role, content))
+        self.session_bytes[session_id] += len(content)
+        self.total_bytes += len(content)
+    
+    def update_session_data(self, session_id: str, key: str, value):
+        """Update session data"""
+        self.initialize_session(session_id)
+        setattr(self.sessions[session_id], key, value)
+    
+    def reset_booking(self, session_id: str):
+        """Clear the booking details collected so far, keeping the conversation history"""
+        self.initialize_session(session_id)
+        self.sessions[session_id] = SessionState(history=self.sessions[session_id].history)
+    
+    def reset_last_message(self, session_id: str):
+        """Reset the last message in the session"""
+        if session_id in self.sessions:
+            self.initialize_session(session_id)
+            state = self.sessions[session_id]
+            if len(state.history) >= 2:
+                del state.history[-2:]
+                self._track_bytes(session_id)
+                return {"status": "Last user-bot message deleted successfully"}
+            else:
+                state.history.clear()
+                self._track_bytes(session_id)
+                return {"status": "Conversation cleared (less than 2 messages)"}
+        else:
+            return {"status": "Session not found"}, 404
+    
+    @asynccontextmanager
+    async def use_session(self, session_id: str):
+        """Serialize requests for one session; with a persistent backend, load it first and save it back afterwards"""
+        lock = self.session_locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self.session_locks[session_id] = lock
+        if lock.locked():
+            self.lock_waits += 1
+        
+        async with lock:
+            if self.store.persistent:
+                await self._load_from_store(session_id)
+            try:
+                yield
+            finally:
+                if self.store.persistent and session_id in self.sessions:
+                    state = self.sessions[session_id]
+                    await asyncio.to_thread(self.store.save, session_id, state.history, state.details())
+    
+    async def _load_from_store(self, session_id: str):
+        """Replace the in-memory copy of a session with the stored one"""
+        stored = await asyncio.to_thread(self.store.load, session_id)
+        # Not stored means new, or expired from the store
+        self.drop_session(session_id)
+        if stored is not None:
+            history, details = stored
+            self.initialize_session(session_id)
+            self.sessions[session_id] = SessionState([tuple(message) for message in history], **details)
+            self._track_bytes(session_id)
+    
+    def _track_bytes(self, session_id: str):
+        """Recount a session's message content after its history was replaced"""
+        size = sum(len(content) for _, content in self.sessions[session_id].history)
+        self.total_bytes += size - self.session_bytes.get(session_id, 0)
+        self.session_bytes[session_id] = size
+    
+    def drop_session(self, session_id: str):
+        """Forget a session's history and booking state"""
+        if self.sessions.pop(session_id, None) is not None and self.track_changes:
+            self.dropped.add(session_id)
+        self.dirty.discard(session_id)
+        self.last_access.pop(session_id, None)
+        self.total_bytes -= self.session_bytes.pop(session_id, 0)
+    
+    def sweep_expired(self):
+        """Drop sessions idle for longer than the TTL; returns how many were dropped"""
+        cutoff = time.monotonic() - self.session_ttl
+        dropped = 0
+        # Sessions are kept in access order, so stop at the first one still live
+        while self.last_access:
+            session_id, last_access = next(iter(self.last_access.items()))
+            if last_access > cutoff:
+                break
+            self.drop_session(session_id)
+            dropped += 1
+        self.expired += dropped
+        return dropped
+    
+    async def sweep_sessions(self):
+        """Periodically drop idle sessions"""
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.sweep_expired()
+            try:
+                await asyncio.to_thread(self.store.delete_expired, time.time() - self.session_ttl)
+            except Exception as e:
+                print(f"Session store sweep error: {e}")
+    
+    def start_sweeper(self):
+        """Start the background idle-session sweeper"""
+        if self.sweep_interval and self._sweep_task is None:
+            self._sweep_task = asyncio.create_task(self.sweep_sessions())
+    
+    def stop_sweeper(self):
+        """Stop the background idle-session sweeper"""
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            self._sweep_task = None
+    
+    def get_stats(self):
+        """Session count, approximate memory held and eviction counters"""
+        return {
+            "sessions": len(self.sessions),
+            "approx_bytes": self.total_bytes,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "locked_sessions": len(self.session_locks),
+            "lock_waits": self.lock_waits,
+        }
\ No newline at end of file
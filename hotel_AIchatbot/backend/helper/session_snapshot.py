@@ -0,0 +1,212 @@
+import os
+import json
+import time
+import struct
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from helper.session_manager import SessionState
+
+# A snapshot file starts with FILE_HEADER, which carries the format version. Every record after it
+# is a little-endian length followed by a JSON [session_id, fields] array, with fields in
+# SESSION_FIELDS order, or null for a dropped session. Bump SNAPSHOT_FORMAT when either changes.
+SNAPSHOT_FORMAT = 1
+FILE_HEADER = b"HCSNAP" + struct.pack("<H", SNAPSHOT_FORMAT)
+RECORD_HEADER = struct.Struct("<I")
+SESSION_FIELDS = SessionState.__slots__
+
+# Sessions encoded per event-loop slice, so a large snapshot never stalls requests for long
+ENCODE_BATCH = 1000
+
+def _encode(session_id: str, state):
+    """One snapshot record for a live session, or a drop marker when state is None"""
+    fields = None if state is None else [getattr(state, name) for name in SESSION_FIELDS]
+    payload = json.dumps([session_id, fields], separators=(",", ":")).encode("utf-8")
+    return RECORD_HEADER.pack(len(payload)) + payload
+
+def _decode(payload):
+    """Session id and fields of one record; raises ValueError if the record is malformed"""
+    session_id, fields = json.loads(bytes(payload))
+    if not isinstance(session_id, str) or not (fields is None or len(fields) == len(SESSION_FIELDS)):
+        raise ValueError("unexpected record layout")
+    return session_id, fields
+
+def _read_records(path: str, records: dict):
+    """Apply a snapshot file's records to records (session id -> (encoded record, fields)), skipping bad ones.
+
+    Returns False if the file exists but is not in this snapshot format.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = memoryview(f.read())
+    except FileNotFoundError:
+        return True
+    except OSError as e:
+        print(f"Session snapshot read error, ignoring {path}: {e}")
+        return True
+    if len(data) < len(FILE_HEADER) and FILE_HEADER.startswith(data):
+        # Interrupted before the header was complete
+        return True
+    if data[:len(FILE_HEADER)] != FILE_HEADER:
+        print(f"Session snapshot {path} is not snapshot format {SNAPSHOT_FORMAT}, ignoring it")
+        return False
+
+    position = len(FILE_HEADER)
+    skipped = 0
+    # A torn tail from an interrupted append is dropped silently
+    while position + RECORD_HEADER.size <= len(data):
+        (length,) = RECORD_HEADER.unpack_from(data, position)
+        end = position + RECORD_HEADER.size + length
+        if end > len(data):
+            break
+        try:
+            session_id, fields = _decode(data[position + RECORD_HEADER.size:end])
+        except (ValueError, TypeError):
+            skipped += 1
+            position = end
+            continue
+        if fields is None:
+            records.pop(session_id, None)
+        else:
+            records[session_id] = (data[position:end], fields)
+        position = end
+    if skipped:
+        print(f"Session snapshot {path}: skipped {skipped} unreadable records")
+    return True
+
+class SessionSnapshotter:
+    """Periodic incremental snapshots of in-memory sessions: a base file plus an append-only delta file"""
+
+    def __init__(self, session_manager, config):
+        self.session_manager = session_manager
+        self.path = config.get("session_snapshot_path", "json/sessions.snapshot")
+        self.delta_path = self.path + ".delta"
+        self.interval = config.get("session_snapshot_interval", 5.0)
+        self.compact_bytes = config.get("session_snapshot_compact_bytes", 16 * 1024 * 1024)
+        # A persistent session backend already survives restarts
+        self.enabled = bool(self.path and self.interval) and not session_manager.store.persistent
+        self.snapshots = 0
+        self.records_written = 0
+        self.compactions = 0
+        self.last_snapshot_seconds = None
+        self.restored = 0
+        self.restore_seconds = None
+        self._task = None
+        # One writer thread keeps appends and compactions in order
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-snapshot")
+
+    def restore(self):
+        """Load the last snapshot into the session manager; returns the number of sessions restored"""
+        if not self.enabled:
+            return 0
+        self.session_manager.track_changes = True
+
+        start = time.perf_counter()
+        records = {}
+        for path in (self.path, self.delta_path):
+            if not _read_records(path, records):
+                # Set the file aside so new snapshots do not append to it
+                os.replace(path, path + ".unreadable")
+        for session_id, (_, fields) in records.items():
+            history, *details = fields
+            self.session_manager.restore_session(session_id, SessionState([tuple(message) for message in history], *details))
+        self.restored = len(records)
+        self.restore_seconds = round(time.perf_counter() - start, 3)
+        return self.restored
+
+    async def _collect(self, dirty, dropped):
+        """Encode changed sessions on the event loop, where no request is mid-update, yielding between batches"""
+        sessions = self.session_manager.sessions
+        chunks = [_encode(session_id, None) for session_id in dropped - dirty]
+        # Sessions changed after the swap are marked dirty again and land in the next snapshot
+        for count, session_id in enumerate(dirty, 1):
+            state = sessions.get(session_id)
+            chunks.append(_encode(session_id, state))
+            if count % ENCODE_BATCH == 0:
+                await asyncio.sleep(0)
+        return chunks
+
+    def _write(self, chunks):
+        """Append a delta, then fold deltas into the base file once they grow large (worker thread)"""
+        if chunks:
+            size = os.path.getsize(self.delta_path) if os.path.exists(self.delta_path) else 0
+            # A new delta file, or one cut short while its header was written, starts with the header
+            with open(self.delta_path, "ab" if size >= len(FILE_HEADER) else "wb") as f:
+                if size < len(FILE_HEADER):
+                    f.write(FILE_HEADER)
+                f.write(b"".join(chunks))
+                f.flush()
+                os.fsync(f.fileno())
+        if os.path.exists(self.delta_path) and os.path.getsize(self.delta_path) >= self.compact_bytes:
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the base file from base plus deltas and start a fresh delta file"""
+        records = {}
+        _read_records(self.path, records)
+        _read_records(self.delta_path, records)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(FILE_HEADER)
+            f.write(b"".join(record for record, _ in records.values()))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        # Replaying the old delta over the new base is harmless if we stop here
+        os.remove(self.delta_path)
+        self.compactions += 1
+
+    async def snapshot(self):
+        """Write sessions changed since the last snapshot without blocking request handling"""
+        start = time.perf_counter()
+        manager = self.session_manager
+        dirty, dropped = manager.dirty, manager.dropped
+        manager.dirty, manager.dropped = set(), set()
+        try:
+            chunks = await self._collect(dirty, dropped)
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._write, chunks)
+        except Exception:
+            # Retry these sessions with the next snapshot
+            manager.dirty |= dirty
+            manager.dropped |= dropped
+            raise
+        self.snapshots += 1
+        self.records_written += len(chunks)
+        self.last_snapshot_seconds = round(time.perf_counter() - start, 4)
+
+    async def snapshot_loop(self):
+        """Snapshot changed sessions every interval"""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.snapshot()
+            except Exception as e:
+                print(f"Session snapshot error: {e}")
+
+    def start(self):
+        """Start periodic snapshots"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self.snapshot_loop())
+
+    async def stop(self):
+        """Stop periodic snapshots and write a final one"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.enabled:
+            try:
+                await self.snapshot()
+            except Exception as e:
+                print(f"Session snapshot error: {e}")
+        self._executor.shutdown(wait=True)
+
+    def get_stats(self):
+        """Snapshot and restore counters"""
+        return {
+            "enabled": self.enabled,
+            "snapshots": self.snapshots,
+            "records_written": self.records_written,
+            "compactions": self.compactions,
+            "last_snapshot_seconds": self.last_snapshot_seconds,
+            "restored": self.restored,
+            "restore_seconds": self.restore_seconds,
+        }
@@ -0,0 +1,89 @@
+import json
+import time
+import sqlite3
+import threading
+
+class MemorySessionStore:
+    """Sessions live only in this process's SessionManager"""
+    name = "memory"
+    persistent = False
+
+    def __init__(self, config):
+        pass
+
+    def load(self, session_id: str):
+        """Nothing to load; the SessionManager's own dicts are authoritative"""
+        return None
+
+    def save(self, session_id: str, conversation, data):
+        """Nothing to save"""
+
+    def delete_expired(self, cutoff: float):
+        """Expiry is handled by the SessionManager's sweeper"""
+        return 0
+
+class SQLiteSessionStore:
+    """Sessions serialized to a SQLite database, so they outlive the process"""
+    name = "sqlite"
+    persistent = True
+
+    def __init__(self, config):
+        self.db_path = config.get("session_db_path", "json/sessions.db")
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                updated_at REAL NOT NULL,
+                conversation TEXT NOT NULL,
+                data TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions(updated_at)")
+        conn.commit()
+
+    def _connection(self):
+        """One connection per thread; waits on other writers instead of failing"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30.0)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, session_id: str):
+        """Return (conversation, session data) for a session, or None if it is not stored"""
+        row = self._connection().execute(
+            "SELECT conversation, data FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), json.loads(row[1])
+
+    def save(self, session_id: str, conversation, data):
+        """Store a session's conversation and data, replacing any previous copy"""
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, updated_at, conversation, data) VALUES (?, ?, ?, ?)",
+                (session_id, time.time(), json.dumps(conversation), json.dumps(data))
+            )
+
+    def delete_expired(self, cutoff: float):
+        """Delete sessions last saved before the cutoff wall-clock time"""
+        conn = self._connection()
+        with conn:
+            return conn.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,)).rowcount
+
+SESSION_STORES = {
+    MemorySessionStore.name: MemorySessionStore,
+    SQLiteSessionStore.name: SQLiteSessionStore,
+}
+
+def get_session_store(config):
+    """Create the session backend selected by the session_backend config key"""
+    name = config.get("session_backend", MemorySessionStore.name)
+    if name not in SESSION_STORES:
+        raise ValueError(f"Unknown session backend: {name}")
+    return SESSION_STORES[name](config)
@@ -0,0 +1,44 @@
+import io
+import time
+from gtts import gTTS
+
+# One silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz)
+SILENT_MP3_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+class GTTSEngine:
+    """Google Translate text-to-speech backend"""
+    name = "gtts"
+
+    def __init__(self, config):
+        pass
+
+    def synthesize(self, text: str, lang: str, tld: str, slow: bool) -> bytes:
+        """Synthesize text to MP3 bytes"""
+        fp = io.BytesIO()
+        gTTS(text=text, lang=lang, tld=tld, slow=slow).write_to_fp(fp)
+        return fp.getvalue()
+
+class SilentTTSEngine:
+    """Local stub backend producing silent MP3 frames, for benchmarks and offline runs"""
+    name = "silent"
+
+    def __init__(self, config):
+        self.latency = config.get("tts_stub_latency", 0.0)
+
+    def synthesize(self, text: str, lang: str, tld: str, slow: bool) -> bytes:
+        """Return roughly one silent frame per word after the configured latency"""
+        if self.latency:
+            time.sleep(self.latency)
+        return SILENT_MP3_FRAME * max(1, len(text.split()))
+
+TTS_ENGINES = {
+    GTTSEngine.name: GTTSEngine,
+    SilentTTSEngine.name: SilentTTSEngine,
+}
+
+def get_tts_engine(config):
+    """Create the TTS backend selected by the tts_engine config key"""
+    name = config.get("tts_engine", GTTSEngine.name)
+    if name not in TTS_ENGINES:
+        raise ValueError(f"Unknown TTS engine: {name}")
+    return TTS_ENGINES[name](config)
\ No newline at end of file
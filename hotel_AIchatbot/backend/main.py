@@ -1,101 +1,258 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-import uuid
-import os
-from gtts import gTTS
-from dotenv import load_dotenv
-from helper.config import load_config
-from helper.models import Message, BookingDetails
-from helper.hotel_service import HotelService
-from helper.ollama_service import OllamaService
-from helper.session_manager import SessionManager
-from helper.booking_service import BookingService
-from helper.audio_service import AudioService
-
-load_dotenv()
-
-app = FastAPI()
-app.mount("/static", StaticFiles(directory="static"), name="static")
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Load configuration
-config = load_config()
-AUDIO_DIR = config["audio_dir"]
-
-# Initialize services
-hotel_service = HotelService(config)
-ollama_service = OllamaService(config)
-session_manager = SessionManager()
-booking_service = BookingService(hotel_service, ollama_service, session_manager)
-audio_service = AudioService(AUDIO_DIR)
-
-# Ensure audio directory exists
-os.makedirs(AUDIO_DIR, exist_ok=True)
-
-# Chat endpoint
-@app.post("/chat/{session_id}")
-async def chat(session_id: str, msg: Message):
-    if not msg.message:
-        raise HTTPException(status_code=400, detail="Message cannot be empty")
-
-    try:
-        # Process the chat message
-        response_data = await booking_service.process_chat_message(session_id, msg.message)
-        
-        # Generate audio for the response
-        audio_id = str(uuid.uuid4())
-        audio_url = await audio_service.generate_audio(response_data["reply"], audio_id)
-        response_data["audio_url"] = audio_url
-        
-        return response_data
-        
-    except Exception as e:
-        print(f"Chat error: {e}")
-        raise HTTPException(status_code=500, detail=f"Chat processing error: {e}")
-
-# Confirm booking endpoint
-@app.post("/confirm/{session_id}")
-async def confirm_booking(session_id: str, details: BookingDetails):
-    try:
-        # Process booking confirmation
-        response_data = await booking_service.confirm_booking(session_id, details)
-        
-        # Generate audio for the response
-        audio_id = str(uuid.uuid4())
-        audio_url = await audio_service.generate_audio(response_data["reply"], audio_id)
-        response_data["audio_url"] = audio_url
-        
-        return response_data
-        
-    except Exception as e:
-        print(f"Booking confirmation error: {e}")
-        raise HTTPException(status_code=500, detail=f"Booking confirmation error: {e}")
-
-# Reset endpoint
-@app.post("/reset/{session_id}")
-async def reset_last_message(session_id: str):
-    return session_manager.reset_last_message(session_id)
-
-# Audio endpoint
-@app.get("/audio/{filename}")
-async def get_audio(filename: str):
-    return await audio_service.get_audio_file(filename)
-
-# Hotels endpoint
-@app.get("/hotels")
-async def get_hotels():
-    return {"hotels": hotel_service.get_all_hotels()}
-
-if __name__ == "__main__":
-    import uvicorn
+from fastapi import FastAPI, HTTPException, Request, Query, Header
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel
+import json
+import asyncio
+import hashlib
+from gtts import gTTS
+from dotenv import load_dotenv
+from helper.config import load_config
+from helper.models import Message, BookingDetails, BatchBookingRequest
+from helper.hotel_service import HotelService
+from helper.ollama_service import OllamaService
+from helper.session_manager import SessionManager
+from helper.session_snapshot import SessionSnapshotter
+from helper.booking_service import BookingService
+from helper.audio_service import AudioService
+from helper.inventory import RoomInventory
+from helper.booking_ledger import BookingLedger
+from helper.idempotency import IdempotencyCache
+from helper.pricing import PricingRules, QuoteEngine
+
+load_dotenv()
+
+app = FastAPI()
+app.mount("/static", StaticFiles(directory="static"), name="static")
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Load configuration
+config = load_config()
+DISCONNECT_POLL_SECONDS = config.get("disconnect_poll_seconds", 0.5)
+BATCH_MAX_BOOKINGS = config.get("batch_max_bookings", 500)
+
+# Initialize services
+hotel_service = HotelService(config)
+ollama_service = OllamaService(config)
+session_manager = SessionManager(config)
+session_snapshotter = SessionSnapshotter(session_manager, config)
+inventory = RoomInventory()
+quote_engine = QuoteEngine(hotel_service, PricingRules(config))
+booking_ledger = BookingLedger(
+    config.get("booking_ledger_path", "json/bookings.db"),
+    max_batch=config.get("booking_ledger_max_batch", 256),
+    max_delay=config.get("booking_ledger_max_delay", 0.0)
+)
+booking_service = BookingService(hotel_service, ollama_service, session_manager, inventory, booking_ledger, quote_engine, config)
+
+# Recover confirmed bookings from the ledger
+print(f"Restored {booking_service.restore_bookings()} bookings from the ledger")
+
+# Warm-restore in-progress sessions from the last snapshot
+print(f"Restored {session_snapshotter.restore()} sessions from the snapshot")
+audio_service = AudioService(config)
+confirm_cache = IdempotencyCache(
+    max_entries=config.get("idempotency_cache_size", 10000),
+    ttl=config.get("idempotency_ttl_seconds", 600.0)
+)
+
+async def generate_audio_unless_disconnected(request: Request, text: str):
+    """Generate audio, cancelling the TTS job if the client disconnects first; None if audio is unavailable"""
+    task = asyncio.create_task(audio_service.get_audio_url_or_none(text))
+    while not task.done():
+        await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+        if not task.done() and await request.is_disconnected():
+            task.cancel()
+            return None
+    return task.result()
+
+# Chat endpoint
+@app.post("/chat/{session_id}")
+async def chat(session_id: str, msg: Message, request: Request):
+    if not msg.message:
+        raise HTTPException(status_code=400, detail="Message cannot be empty")
+
+    try:
+        # Process the chat message
+        async with session_manager.use_session(session_id):
+            response_data = await booking_service.process_chat_message(session_id, msg.message)
+        
+        # Generate audio for the response
+        audio_url = await generate_audio_unless_disconnected(request, response_data["reply"])
+        response_data["audio_url"] = audio_url
+        
+        return response_data
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Chat error: {e}")
+        raise HTTPException(status_code=500, detail=f"Chat processing error: {e}")
+
+# Streaming chat endpoint (Server-Sent Events)
+@app.post("/chat/{session_id}/stream")
+async def chat_stream(session_id: str, msg: Message):
+    if not msg.message:
+        raise HTTPException(status_code=400, detail="Message cannot be empty")
+
+    queue = asyncio.Queue()
+
+    async def on_token(token: str):
+        await queue.put(("token", {"token": token}))
+
+    async def run():
+        try:
+            async with session_manager.use_session(session_id):
+                response_data = await booking_service.process_chat_message(session_id, msg.message, on_token=on_token)
+
+            # Generate audio for the full reply once generation is finished
+            audio_url = await audio_service.get_audio_url_or_none(response_data["reply"])
+            response_data["audio_url"] = audio_url
+
+            await queue.put(("final", response_data))
+        except Exception as e:
+            print(f"Chat stream error: {e}")
+            await queue.put(("error", {"detail": f"Chat processing error: {e}"}))
+
+    async def event_stream():
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                event, data = await queue.get()
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+                if event != "token":
+                    break
+        finally:
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+# Batch booking confirmation endpoint for agency integrations
+@app.post("/confirm/batch")
+async def confirm_batch(batch: BatchBookingRequest):
+    if len(batch.bookings) > BATCH_MAX_BOOKINGS:
+        raise HTTPException(status_code=400, detail=f"A batch may contain at most {BATCH_MAX_BOOKINGS} bookings")
+
+    response_data = await booking_service.confirm_batch(
+        batch.bookings, include_summary=batch.include_summary or batch.include_audio
+    )
+
+    # Audio only when explicitly requested
+    confirmed = [result for result in response_data["results"] if result["status"] == "confirmed"]
+    if batch.include_audio:
+        audio_urls = await asyncio.gather(*(audio_service.get_audio_url_or_none(result["summary"]) for result in confirmed))
+        for result, audio_url in zip(confirmed, audio_urls):
+            result["audio_url"] = audio_url
+    if not batch.include_summary:
+        for result in confirmed:
+            result.pop("summary", None)
+
+    return response_data
+
+# Confirm booking endpoint
+@app.post("/confirm/{session_id}")
+async def confirm_booking(session_id: str, details: BookingDetails, idempotency_key: str | None = Header(None)):
+    # Retries with the same Idempotency-Key (or the same booking payload) share one result
+    key = idempotency_key or hashlib.sha256(details.model_dump_json().encode("utf-8")).hexdigest()
+
+    async def process():
+        # Process booking confirmation; the result is cached as soon as the booking is recorded
+        async with session_manager.use_session(session_id):
+            return await booking_service.confirm_booking(session_id, details)
+
+    try:
+        response_data = dict(await confirm_cache.run(f"{session_id}:{key}", process))
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Booking confirmation error: {e}")
+        raise HTTPException(status_code=500, detail=f"Booking confirmation error: {e}")
+    
+    # Audio is best-effort and cached by content, so a retry reuses the same file
+    response_data["audio_url"] = await audio_service.get_audio_url_or_none(response_data["reply"])
+    return response_data
+
+# Reset endpoint
+@app.post("/reset/{session_id}")
+async def reset_last_message(session_id: str):
+    async with session_manager.use_session(session_id):
+        return session_manager.reset_last_message(session_id)
+
+# Audio endpoint
+@app.get("/audio/{filename}")
+async def get_audio(filename: str):
+    return await audio_service.get_audio_file(filename)
+
+# Quote endpoint
+@app.get("/quote")
+def get_quote(
+    check_in: str,
+    check_out: str,
+    location: str | None = None,
+    hotel_names: list[str] | None = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    return quote_engine.quote(check_in, check_out, location=location, hotel_names=hotel_names, limit=limit, offset=offset)
+
+# Metrics endpoint
+@app.get("/metrics")
+async def get_metrics():
+    return {
+        "booking": booking_service.get_stats(),
+        "audio": audio_service.get_stats(),
+        "hotels": hotel_service.get_stats(),
+        "idempotency": confirm_cache.get_stats(),
+        "sessions": session_manager.get_stats(),
+        "snapshots": session_snapshotter.get_stats(),
+    }
+
+# Start background watchers
+@app.on_event("startup")
+async def startup():
+    hotel_service.start_watcher()
+    session_manager.start_sweeper()
+    session_snapshotter.start()
+
+# Release pooled connections on shutdown
+@app.on_event("shutdown")
+async def shutdown():
+    hotel_service.stop_watcher()
+    session_manager.stop_sweeper()
+    await session_snapshotter.stop()
+    await ollama_service.close()
+    audio_service.close()
+    booking_ledger.close()
+
+# Hotels endpoint
+@app.get("/hotels")
+def get_hotels(
+    location: str | None = None,
+    min_price: float | None = Query(None, ge=0),
+    max_price: float | None = Query(None, ge=0),
+    min_guests: int | None = Query(None, ge=1),
+    sort: str | None = None,
+    order: str = "asc",
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    fields: str | None = None,
+):
+    return hotel_service.query_hotels(
+        location=location, min_price=min_price, max_price=max_price, min_guests=min_guests,
+        sort=sort, order=order, limit=limit, offset=offset, fields=fields
+    )
+
+if __name__ == "__main__":
+    # One process only: room inventory, the idempotency cache and session locks live in memory here
+    import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
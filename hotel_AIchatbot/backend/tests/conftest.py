@@ -0,0 +1,84 @@
+import os
+import sys
+import json
+import shutil
+import asyncio
+import importlib
+import httpx
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from fastapi.testclient import TestClient
+from helper import config as config_module
+
+# Settings every test app runs with: local stubs instead of Ollama and gTTS, no background pollers
+TEST_CONFIG = {
+    "ollama_host": "http://ollama.test",
+    "tts_engine": "silent",
+    "hotel_reload_interval": 0,
+    "session_sweep_interval": 0,
+}
+
+def ollama_transport(reply="Happy to help with your booking!", latency=0.0):
+    """httpx transport answering /api/chat like Ollama, in both normal and stream mode"""
+    async def handler(request):
+        body = json.loads(request.content)
+        if latency:
+            await asyncio.sleep(latency)
+        if body.get("stream"):
+            chunks = [{"message": {"content": f"{word} "}, "done": False} for word in reply.split()]
+            chunks.append({"message": {"content": ""}, "done": True})
+            return httpx.Response(200, text="".join(json.dumps(chunk) + "\n" for chunk in chunks))
+        return httpx.Response(200, json={"message": {"content": reply}})
+    return httpx.MockTransport(handler)
+
+def book_via_chat(client, session_id, hotel_name="Hotel Gopal", check_in="2030-05-20", check_out="2030-05-25", location="Dwarka"):
+    """Walk one session through the chat booking flow; returns the final response"""
+    messages = [
+        f"I need a hotel in {location} from {check_in} to {check_out}",
+        hotel_name,
+        check_in,
+        check_out,
+        "1",
+        "John Doe",
+        "123-456-7890",
+    ]
+    for message in messages:
+        response = client.post(f"/chat/{session_id}", json={"message": message})
+        assert response.status_code == 200, response.text
+    return response.json()
+
+@pytest.fixture
+def app_factory(tmp_path, monkeypatch):
+    """Import main.py inside a scratch directory with its own config, databases and audio cache"""
+    os.makedirs(tmp_path / "json")
+    os.makedirs(tmp_path / "static")
+    shutil.copy(os.path.join(BACKEND_DIR, "json", "hotel.json"), tmp_path / "json" / "hotel.json")
+    monkeypatch.chdir(tmp_path)
+    base_config = config_module.load_config()
+
+    def start(reply="Happy to help with your booking!", latency=0.0, **overrides):
+        config = {**base_config, **TEST_CONFIG, **overrides}
+        monkeypatch.setattr(config_module, "load_config", lambda: config)
+        sys.modules.pop("main", None)
+        main = importlib.import_module("main")
+        main.ollama_service._client = httpx.AsyncClient(
+            base_url=config["ollama_host"], transport=ollama_transport(reply, latency)
+        )
+        return main
+
+    yield start
+    sys.modules.pop("main", None)
+
+@pytest.fixture
+def app(app_factory):
+    """main.py with default test settings"""
+    return app_factory()
+
+@pytest.fixture
+def client(app):
+    """TestClient that runs the app's startup and shutdown hooks"""
+    with TestClient(app.app) as client:
+        yield client
@@ -0,0 +1,52 @@
+import asyncio
+from helper.audio_service import AudioService
+
+def make_service(tmp_path, **overrides):
+    return AudioService({"audio_dir": str(tmp_path / "audio"), "tts_engine": "silent", **overrides})
+
+def test_identical_text_reuses_the_cached_file(tmp_path):
+    service = make_service(tmp_path)
+
+    async def scenario():
+        return [await service.get_audio_url("Hello there.") for _ in range(3)]
+
+    urls = asyncio.run(scenario())
+    service.close()
+    assert len(set(urls)) == 1
+    assert (service.hits, service.misses) == (2, 1)
+
+def test_cache_is_bounded(tmp_path):
+    service = make_service(tmp_path, audio_cache_max_bytes=2000)
+
+    async def scenario():
+        for index in range(10):
+            await service.get_audio_url(f"Reply number {index}")
+
+    asyncio.run(scenario())
+    service.close()
+    assert service.cache_bytes <= 2000
+    assert len(list((tmp_path / "audio").iterdir())) == len(service.cache_index)
+
+def test_full_queue_yields_no_audio_instead_of_an_error(tmp_path):
+    service = make_service(tmp_path, tts_queue_size=0)
+    assert asyncio.run(service.get_audio_url_or_none("Hello")) is None
+    service.close()
+    assert service.get_stats()["skipped"] == 1
+
+def test_chat_reply_survives_audio_failure(app_factory):
+    from fastapi.testclient import TestClient
+    main = app_factory(tts_queue_size=0)
+    with TestClient(main.app) as client:
+        response = client.post("/chat/s1", json={"message": "I need a hotel in Dwarka from 2030-05-20 to 2030-05-25"})
+        assert response.status_code == 200
+        assert response.json()["audio_url"] is None
+        assert response.json()["step"] == "showing_hotels"
+
+        # The next message answers the next step rather than repeating this one
+        response = client.post("/chat/s1", json={"message": "Hotel Gopal"})
+        assert response.status_code == 200
+        assert response.json()["step"] == "check_in"
+
+        with client.stream("POST", "/chat/s2/stream", json={"message": "hello"}) as response:
+            body = response.read().decode()
+        assert "event: final" in body and '"audio_url": null' in body
@@ -0,0 +1,28 @@
+import asyncio
+from helper.booking_ledger import BookingLedger
+
+def booking(day):
+    return {"hotel_name": "Hotel Gopal", "check_in": f"2030-05-{day:02d}", "check_out": f"2030-05-{day + 1:02d}"}
+
+def test_concurrent_appends_share_commits_and_replay_in_order(tmp_path):
+    ledger = BookingLedger(str(tmp_path / "bookings.db"), max_batch=64, max_delay=0.01)
+
+    async def scenario():
+        return await asyncio.gather(*(ledger.append(booking(day)) for day in range(1, 21)))
+
+    ids = asyncio.run(scenario())
+    ledger.close()
+    assert sorted(ids) == list(range(1, 21))
+    stats = ledger.get_stats()
+    assert stats["appended"] == 20 and stats["commits"] < 20
+
+    replayed = list(BookingLedger(str(tmp_path / "bookings.db")).replay())
+    assert [row["booking_id"] for row in replayed] == list(range(1, 21))
+    assert replayed[ids[4] - 1]["check_in"] == "2030-05-05"
+
+def test_append_many_is_one_transaction(tmp_path):
+    ledger = BookingLedger(str(tmp_path / "bookings.db"))
+    ids = asyncio.run(ledger.append_many([booking(1), booking(2), booking(3)]))
+    ledger.close()
+    assert ids == [1, 2, 3]
+    assert ledger.get_stats()["commits"] == 1
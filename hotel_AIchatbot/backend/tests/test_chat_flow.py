@@ -0,0 +1,115 @@
+from conftest import book_via_chat
+
+def test_chat_booking_flow(client, app):
+    response = client.post("/chat/s1", json={"message": "I need a hotel in Dwarka from 2030-05-20 to 2030-05-25"})
+    data = response.json()
+    assert data["step"] == "showing_hotels"
+    assert len(data["hotels"]) == 8
+    assert "Hotel Gopal" in data["reply"] and "Total for 5 nights" in data["reply"]
+    assert data["audio_url"].startswith("/audio/")
+
+    result = book_via_chat(client, "s2")
+    assert result["step"] == "completed"
+    assert result["json"]["hotel_name"] == "Hotel Gopal"
+    assert result["json"]["total"] == 1800 * 5 * 1.15
+    assert result["json"]["booking_id"] == 1
+    assert app.inventory.get_stats()["bookings"] == 1
+
+def test_booked_hotel_is_not_listed_again(client):
+    book_via_chat(client, "s1")
+    data = client.post("/chat/s2", json={"message": "I need a hotel in Dwarka from 2030-05-22 to 2030-05-23"}).json()
+    assert "Hotel Gopal" not in [hotel["hotel_name"] for hotel in data["hotels"]]
+    assert len(data["hotels"]) == 7
+
+def test_small_talk_goes_to_the_llm(client, app):
+    data = client.post("/chat/s1", json={"message": "hello"}).json()
+    assert data["reply"] == "Happy to help with your booking!"
+    assert app.booking_service.get_stats()["llm_calls"] == {"initial": 1}
+
+def test_stream_endpoint_relays_tokens(client):
+    with client.stream("POST", "/chat/s1/stream", json={"message": "hello"}) as response:
+        body = response.read().decode()
+    assert body.count("event: token") == 6
+    assert "event: final" in body
+
+def test_direct_confirm_refuses_overlaps(client):
+    booking = {
+        "hotel_name": "Hotel Gopal", "room_type": "double", "check_in": "2031-01-01", "check_out": "2031-01-03",
+        "guests": 1, "guest_names": ["Ann"], "phone": "123-456-7890", "location": "Dwarka, Gujarat",
+    }
+    assert client.post("/confirm/s1", json=booking).status_code == 200
+    overlapping = {**booking, "check_in": "2031-01-02", "check_out": "2031-01-04"}
+    assert client.post("/confirm/s2", json=overlapping).status_code == 409
+
+def test_bookings_survive_a_restart(app_factory):
+    from fastapi.testclient import TestClient
+    with TestClient(app_factory().app) as client:
+        book_via_chat(client, "s1")
+    main = app_factory()
+    assert main.inventory.get_stats()["bookings"] == 1
+    assert not main.inventory.is_available("Hotel Gopal", "2030-05-21", "2030-05-22")
+
+def test_city_and_state_lists_the_city(client):
+    data = client.post("/chat/s1", json={"message": "hotel in Dwarka, Gujarat from May 20 to May 25"}).json()
+    assert len(data["hotels"]) == 8
+    assert {hotel["location"] for hotel in data["hotels"]} == {"Dwarka, Gujarat"}
+
+def test_session_starts_over_after_a_booking(client, app):
+    book_via_chat(client, "s1")
+    response = client.post("/chat/s1", json={"message": "thanks!"})
+    assert response.status_code == 200
+    assert response.json()["step"] == "initial"
+
+    result = book_via_chat(client, "s1", check_in="2030-06-01", check_out="2030-06-03")
+    assert result["json"]["check_in"] == "2030-06-01"
+    assert app.inventory.get_stats()["bookings"] == 2
+
+def test_nights_taken_before_the_phone_step_ask_for_new_dates(client, app):
+    for message in ["I need a hotel in Dwarka from 2030-05-20 to 2030-05-25", "Hotel Gopal", "2030-05-20", "2030-05-25", "1", "John Doe"]:
+        client.post("/chat/s1", json={"message": message})
+    booking = {
+        "hotel_name": "Hotel Gopal", "room_type": "double", "check_in": "2030-05-22", "check_out": "2030-05-23",
+        "guests": 1, "guest_names": ["Ann"], "phone": "123-456-7890", "location": "Dwarka, Gujarat",
+    }
+    assert client.post("/confirm/s2", json=booking).status_code == 200
+
+    response = client.post("/chat/s1", json={"message": "123-456-7890"})
+    assert response.status_code == 200
+    assert response.json()["step"] == "check_in"
+    assert "was just booked" in response.json()["reply"]
+
+    client.post("/chat/s1", json={"message": "2030-06-01"})
+    result = client.post("/chat/s1", json={"message": "2030-06-04"}).json()
+    assert result["step"] == "completed"
+    assert (result["json"]["check_in"], result["json"]["check_out"]) == ("2030-06-01", "2030-06-04")
+    assert result["json"]["guest_names"] == ["John Doe"]
+
+def test_priced_listings_are_memoized_until_the_inventory_changes(client, app, monkeypatch):
+    catalog = app.hotel_service.catalog
+    renders = []
+    render = catalog._render_hotel_list
+    monkeypatch.setattr(catalog, "_render_hotel_list", lambda *args: renders.append(args) or render(*args))
+    message = {"message": "I need a hotel in Dwarka from 2030-05-20 to 2030-05-25"}
+
+    first = client.post("/chat/s1", json=message).json()
+    second = client.post("/chat/s2", json=message).json()
+    assert len(renders) == 1
+    assert first["reply"] == second["reply"] and first["audio_url"] == second["audio_url"]
+    assert app.audio_service.get_stats()["cache_hits"] >= 1
+
+    book_via_chat(client, "s3")
+    third = client.post("/chat/s4", json=message).json()
+    assert len(renders) == 2
+    assert "Hotel Gopal" not in third["reply"]
+
+def test_unsupported_dates_are_asked_for_again(client, app):
+    data = client.post("/chat/s1", json={"message": "I need a hotel in Dwarka from 9999-05-20 to 9999-05-25"}).json()
+    assert data["step"] == "initial"
+    data = client.post("/chat/s1", json={"message": "I need a hotel in Dwarka from 2030-05-20 to 2030-05-25"}).json()
+    assert data["step"] == "showing_hotels"
+
+    client.post("/chat/s2", json={"message": "I need a hotel in Dwarka from 2030-05-20 to 2030-05-25"})
+    client.post("/chat/s2", json={"message": "Hotel Gopal"})
+    data = client.post("/chat/s2", json={"message": "9999-05-20"}).json()
+    assert data["step"] == "check_in"
+    assert "check-in date" in data["reply"]
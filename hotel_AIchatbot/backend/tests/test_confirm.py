@@ -0,0 +1,102 @@
+import json
+import pytest
+
+BOOKING = {
+    "hotel_name": "Hotel Gopal", "room_type": "double", "check_in": "2031-01-01", "check_out": "2031-01-03",
+    "guests": 1, "guest_names": ["Ann"], "phone": "123-456-7890", "location": "Dwarka, Gujarat",
+}
+
+def test_retry_with_the_same_key_returns_the_first_result(client, app):
+    first = client.post("/confirm/s1", json=BOOKING, headers={"Idempotency-Key": "k1"})
+    retry = client.post("/confirm/s1", json=BOOKING, headers={"Idempotency-Key": "k1"})
+    assert first.status_code == retry.status_code == 200
+    assert first.json() == retry.json()
+    assert app.booking_ledger.get_stats()["appended"] == 1
+
+def test_payload_is_the_key_without_a_header(client, app):
+    assert client.post("/confirm/s1", json=BOOKING).json() == client.post("/confirm/s1", json=BOOKING).json()
+    assert client.post("/confirm/s2", json=BOOKING).status_code == 409
+    assert app.booking_ledger.get_stats()["appended"] == 1
+
+def test_audio_failure_does_not_fail_a_recorded_booking(app_factory):
+    from fastapi.testclient import TestClient
+    main = app_factory(tts_queue_size=0)
+    with TestClient(main.app) as client:
+        first = client.post("/confirm/s1", json=BOOKING, headers={"Idempotency-Key": "k1"})
+        assert first.status_code == 200
+        assert first.json()["audio_url"] is None
+        assert first.json()["json"]["booking_id"] == 1
+
+        # The retry gets the same booking, not a 409 for its own reservation
+        retry = client.post("/confirm/s1", json=BOOKING, headers={"Idempotency-Key": "k1"})
+        assert retry.status_code == 200
+        assert retry.json()["json"]["booking_id"] == 1
+        assert main.booking_ledger.get_stats()["appended"] == 1
+
+@pytest.mark.parametrize("mode", ["deterministic", "llm"])
+def test_failed_booking_is_not_confirmed_in_the_history(app_factory, mode):
+    from fastapi.testclient import TestClient
+    main = app_factory(confirmation_mode=mode, reply="Booking confirmed!")
+
+    async def failing_append(booking):
+        raise OSError("disk full")
+
+    main.booking_ledger.append = failing_append
+    with TestClient(main.app) as client:
+        assert client.post("/confirm/s1", json=BOOKING).status_code == 500
+    session = main.session_manager.sessions.get("s1")
+    assert session is None or not [content for role, content in session.history if role == "assistant"]
+    assert main.inventory.get_stats()["bookings"] == 0
+
+def test_batch_confirms_and_rejects_per_item(client):
+    items = [
+        BOOKING,
+        {**BOOKING, "check_in": "2031-01-02", "check_out": "2031-01-04"},
+        {**BOOKING, "phone": "bad"},
+        {**BOOKING, "hotel_name": "Nope"},
+    ]
+    result = client.post("/confirm/batch", json={"bookings": items, "include_audio": True}).json()
+    assert (result["confirmed"], result["rejected"]) == (1, 3)
+    assert [item["status_code"] for item in result["results"][1:]] == [409, 422, 404]
+    assert result["results"][2]["error"].startswith("phone: ")
+    assert result["results"][0]["audio_url"].startswith("/audio/")
+
+@pytest.mark.parametrize("check_in, check_out", [("1999-01-01", "1999-01-03"), ("9999-01-01", "9999-01-03")])
+def test_unsupported_dates_are_a_bad_request(client, app, check_in, check_out):
+    response = client.post("/confirm/s1", json={**BOOKING, "check_in": check_in, "check_out": check_out})
+    assert response.status_code == 400
+    assert app.inventory.booked_nights == {}
+
+def test_batch_rejects_unsupported_dates_per_item(client):
+    items = [BOOKING, {**BOOKING, "check_in": "9999-01-01", "check_out": "9999-01-03"}]
+    result = client.post("/confirm/batch", json={"bookings": items}).json()
+    assert (result["confirmed"], result["rejected"]) == (1, 1)
+    assert result["results"][1]["status_code"] == 400
+
+def confirm_with_llm_reply(app_factory, mode, reply):
+    from fastapi.testclient import TestClient
+    main = app_factory(confirmation_mode=mode, reply=reply)
+    with TestClient(main.app) as client:
+        response = client.post("/confirm/s1", json=BOOKING)
+        stats = main.booking_service.get_stats()
+    return response, stats
+
+def test_llm_json_cannot_change_the_recorded_booking(app_factory):
+    hallucinated = {**BOOKING, "hotel_name": "Hotel Damji", "guests": 4, "check_out": "2031-01-09"}
+    del hallucinated["room_type"]
+    response, stats = confirm_with_llm_reply(app_factory, "llm", json.dumps(hallucinated))
+    booking = response.json()["json"]
+    assert (booking["hotel_name"], booking["guests"], booking["check_out"]) == ("Hotel Gopal", 1, "2031-01-03")
+    assert booking["total"] == 1800 * 2 * 1.15
+    assert stats["llm_json_mismatches"] == 1
+    assert stats["llm_calls"] == {"confirm": 1}
+
+def test_matching_llm_json_is_not_reported(app_factory):
+    matching = {key: value for key, value in BOOKING.items() if key != "room_type"}
+    response, stats = confirm_with_llm_reply(app_factory, "llm", json.dumps(matching))
+    assert response.json()["reply"] == json.dumps(matching)
+    assert stats["llm_json_mismatches"] == 0
+
+def test_unknown_confirmation_mode_is_rejected(app_factory):
+    with pytest.raises(ValueError, match="Unknown confirmation mode"):
+        app_factory(confirmation_mode="llm_json")
@@ -0,0 +1,58 @@
+from datetime import date
+import pytest
+from helper.config import load_config
+from helper.date_parser import DateParser, DateRange
+
+TODAY = date(2026, 3, 1)
+
+@pytest.fixture(scope="module")
+def parser():
+    return DateParser(load_config()["date_pattern"])
+
+@pytest.mark.parametrize("message, expected", [
+    ("hotel in Dwarka from May 20 to May 25", DateRange(date(2026, 5, 20), date(2026, 5, 25))),
+    ("from 20th May to 25th May", DateRange(date(2026, 5, 20), date(2026, 5, 25))),
+    ("20 to 25 May please", DateRange(date(2026, 5, 20), date(2026, 5, 25))),
+    ("Dec 28 to 3", DateRange(date(2026, 12, 28), date(2027, 1, 3))),
+    ("Dec 28 to Jan 3", DateRange(date(2026, 12, 28), date(2027, 1, 3))),
+    ("2030-05-20 to 2030-05-25", DateRange(date(2030, 5, 20), date(2030, 5, 25))),
+    ("20/12/2026 - 23/12/2026", DateRange(date(2026, 12, 20), date(2026, 12, 23))),
+    ("check in 2030-05-20", DateRange(date(2030, 5, 20), None)),
+    ("check in 2030-05-20, checkout 2030-05-25", DateRange(date(2030, 5, 20), date(2030, 5, 25))),
+    ("arriving May 20, leaving May 25", DateRange(date(2026, 5, 20), date(2026, 5, 25))),
+    ("check in 2030-05-25, not 2030-05-20", DateRange(date(2030, 5, 25), None)),
+    ("20-05-2030", DateRange(date(2030, 5, 20), None)),
+    ("20.12.26", DateRange(date(2026, 12, 20), None)),
+    ("20/05/30 to 25/05/30", DateRange(date(2030, 5, 20), date(2030, 5, 25))),
+    ("May 20th", DateRange(date(2026, 5, 20), None)),
+    ("Jan 5", DateRange(date(2027, 1, 5), None)),
+])
+def test_finds_dates(parser, message, expected):
+    assert parser.find(message, today=TODAY) == expected
+
+@pytest.mark.parametrize("message", [
+    "hello there",
+    "I need a hotel in Jaipur",
+    "2 guests",
+    "2030-02-30",
+    "2030-05-25 to 2030-05-20",
+    "from May 25 to May 20",
+    "25 to 20 May",
+    "25th May to 25th May",
+])
+def test_rejects_non_dates(parser, message):
+    assert parser.find(message, today=TODAY) is None
+
+def test_skips_invalid_match_for_a_later_valid_one(parser):
+    assert parser.find("not 2030-02-30 but 2030-03-02", today=TODAY) == DateRange(date(2030, 3, 2), None)
+
+def test_unknown_group_names_are_rejected():
+    with pytest.raises(ValueError):
+        DateParser([r"(?P<when>\d+)"])
+
+def test_dates_outside_the_bounds_are_skipped():
+    parser = DateParser(load_config()["date_pattern"], date(2000, 1, 1), date(2099, 12, 31))
+    assert parser.find("1999-05-20 to 1999-05-25", today=TODAY) is None
+    assert parser.find("9999-05-20", today=TODAY) is None
+    assert parser.find("2099-12-30 to 2100-01-02", today=TODAY) is None
+    assert parser.find("9999-05-20 or 2030-05-20", today=TODAY) == DateRange(date(2030, 5, 20), None)
@@ -0,0 +1,34 @@
+import numpy as np
+from helper.hotel_columns import HotelColumns
+
+HOTELS = [
+    {"hotel_name": "C", "location": "Dwarka, Gujarat", "price_per_night": 150, "number_of_guests": 4},
+    {"hotel_name": "A", "location": "Surat, Gujarat", "price_per_night": 250, "number_of_guests": 3},
+    {"hotel_name": "B", "location": "Pune, Maharashtra", "price_per_night": 120, "number_of_guests": 5},
+    {"hotel_name": "D", "location": "Okha, Dwarka, Gujarat", "price_per_night": 90, "number_of_guests": 2},
+    {"hotel_name": "E", "location": "Gujarat", "price_per_night": 180, "number_of_guests": 3},
+]
+
+def test_location_uses_city_and_state_codes():
+    columns = HotelColumns(HOTELS)
+    # "Gujarat" alone is a city-position part for hotel E and a state for the others
+    assert columns.query(location="gujarat").tolist() == [0, 1, 3, 4]
+    assert columns.query(location=" Surat ").tolist() == [1]
+    assert columns.query(location="atlantis").tolist() == []
+
+def test_gujarat_under_200_for_three_guests_sorted_by_price():
+    columns = HotelColumns(HOTELS)
+    ids = columns.query(location="Gujarat", max_price=200, min_guests=3, sort="price_per_night")
+    assert ids.tolist() == [0, 4]
+    ids = columns.query(location="Gujarat", max_price=200, min_guests=3, sort="price_per_night", order="desc")
+    assert ids.tolist() == [4, 0]
+
+def test_candidate_ids_and_name_sort():
+    columns = HotelColumns(HOTELS)
+    assert columns.query(ids=np.array([0, 1, 2]), sort="hotel_name").tolist() == [1, 2, 0]
+
+def test_middle_location_parts_have_no_code():
+    columns = HotelColumns(HOTELS)
+    assert columns.has_location_code("Gujarat") and columns.has_location_code("okha")
+    # Dwarka is a city for hotel 0 but a middle part for hotel 3
+    assert not columns.has_location_code("dwarka")
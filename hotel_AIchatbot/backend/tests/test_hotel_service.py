@@ -0,0 +1,54 @@
+import json
+import asyncio
+import shutil
+import pytest
+from conftest import BACKEND_DIR
+from helper.hotel_service import HotelService
+
+@pytest.fixture
+def hotel_json(tmp_path):
+    path = tmp_path / "hotel.json"
+    shutil.copy(f"{BACKEND_DIR}/json/hotel.json", path)
+    return path
+
+def make_service(tmp_path, hotel_json, **overrides):
+    return HotelService({"hotel_json_path": str(hotel_json), **overrides})
+
+def test_reload_swaps_in_the_new_catalog(tmp_path, hotel_json):
+    service = make_service(tmp_path, hotel_json)
+    hotels = json.loads(hotel_json.read_text())
+    hotel_json.write_text(json.dumps(hotels[:5]))
+    assert asyncio.run(service.reload_hotels())
+    assert len(service.hotels) == 5
+    assert service.get_stats()["reload_count"] == 1
+
+def test_failed_reload_keeps_the_old_catalog(tmp_path, hotel_json):
+    service = make_service(tmp_path, hotel_json)
+    hotels = json.loads(hotel_json.read_text())
+    # Passes the file checks but cannot be rendered
+    hotel_json.write_text(json.dumps(hotels[:5] + [{**hotels[0], "hotel_name": "Broken", "amenities": 5}]))
+    assert not asyncio.run(service.reload_hotels())
+    assert len(service.hotels) == 28
+    assert service.query_hotels()["total"] == 28
+    assert service.get_stats()["reload_failures"] == 1
+
+def test_missing_description_renders(tmp_path, hotel_json):
+    hotels = json.loads(hotel_json.read_text())
+    hotel_json.write_text(json.dumps([{**hotels[0], "description": None}]))
+    service = make_service(tmp_path, hotel_json)
+    assert "No description available" in service.format_hotel_list()
+
+def test_query_filters_sorts_and_pages(tmp_path, hotel_json):
+    service = make_service(tmp_path, hotel_json)
+    result = service.query_hotels(location="Gujarat", max_price=3000, min_guests=3, sort="price_per_night", limit=2, fields="hotel_name,price_per_night")
+    assert result["total"] == 6
+    assert result["hotels"] == [
+        {"hotel_name": "Hotel Gopal", "price_per_night": 1800},
+        {"hotel_name": "Hotel Dwarka Residency", "price_per_night": 2500},
+    ]
+    assert service.query_hotels(location="Gujarat", sort="price_per_night", order="desc", limit=1)["hotels"][0]["price_per_night"] == 5500
+
+def test_query_and_chat_listing_agree_on_locations(tmp_path, hotel_json):
+    service = make_service(tmp_path, hotel_json)
+    for location in ["Dwarka", "gujarat", "Dwarka, Gujarat", "guj", "Uttar Pradesh", "Atlantis"]:
+        assert service.query_hotels(location=location, limit=500)["hotels"] == service.get_hotels_by_location(location)
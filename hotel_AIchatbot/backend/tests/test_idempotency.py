@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+from helper.idempotency import IdempotencyCache
+
+def test_duplicates_share_one_computation():
+    cache = IdempotencyCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"booking_id": len(calls)}
+
+    async def scenario():
+        concurrent = await asyncio.gather(*(cache.run("k", compute) for _ in range(5)))
+        later = await cache.run("k", compute)
+        return concurrent, later
+
+    concurrent, later = asyncio.run(scenario())
+    assert calls == [1]
+    assert concurrent == [{"booking_id": 1}] * 5 and later == {"booking_id": 1}
+    assert cache.get_stats() == {"hits": 1, "coalesced": 4, "misses": 1, "entries": 1, "in_flight": 0}
+
+def test_failures_are_not_cached():
+    cache = IdempotencyCache()
+    attempts = []
+
+    async def compute():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+        return "ok"
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await cache.run("k", compute)
+        return await cache.run("k", compute)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert len(attempts) == 2
+
+def test_entries_expire_and_are_bounded():
+    cache = IdempotencyCache(max_entries=2, ttl=0.0)
+
+    async def compute():
+        return "fresh"
+
+    async def scenario():
+        for key in ["a", "b", "c"]:
+            await cache.run(key, compute)
+        await cache.run("c", compute)
+
+    asyncio.run(scenario())
+    assert cache.get_stats()["hits"] == 0
+    assert cache.get_stats()["entries"] <= 2
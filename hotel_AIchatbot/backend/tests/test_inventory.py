@@ -0,0 +1,45 @@
+import pytest
+from helper.inventory import RoomInventory
+
+def test_overlapping_stays_are_refused():
+    inventory = RoomInventory()
+    assert inventory.reserve("Hotel Gopal", "2030-05-20", "2030-05-25")
+    assert not inventory.reserve("Hotel Gopal", "2030-05-24", "2030-05-26")
+    assert not inventory.reserve("Hotel Gopal", "2030-05-18", "2030-05-21")
+    assert not inventory.is_available("Hotel Gopal", "2030-05-21", "2030-05-22")
+
+def test_back_to_back_stays_and_other_hotels_are_free():
+    inventory = RoomInventory()
+    assert inventory.reserve("Hotel Gopal", "2030-05-20", "2030-05-25")
+    assert inventory.reserve("Hotel Gopal", "2030-05-25", "2030-05-27")
+    assert inventory.reserve("Hotel Gopal", "2030-05-17", "2030-05-20")
+    assert inventory.reserve("Hotel Damji", "2030-05-20", "2030-05-25")
+    assert inventory.get_stats() == {"bookings": 4, "hotels_with_bookings": 2}
+
+def test_release_frees_the_nights():
+    inventory = RoomInventory()
+    inventory.reserve("Hotel Gopal", "2030-05-20", "2030-05-25")
+    inventory.release("Hotel Gopal", "2030-05-20", "2030-05-25")
+    assert inventory.is_available("Hotel Gopal", "2030-05-20", "2030-05-25")
+    assert inventory.get_stats()["bookings"] == 0
+
+def test_empty_stays_are_never_available():
+    inventory = RoomInventory()
+    assert not inventory.is_available("Hotel Gopal", "2030-05-20", "2030-05-20")
+    assert not inventory.reserve("Hotel Gopal", "2030-05-20", "2030-05-19")
+
+@pytest.mark.parametrize("check_in, check_out", [("1999-12-30", "2000-01-02"), ("2099-12-30", "2100-01-02"), ("9999-01-01", "9999-01-05")])
+def test_dates_outside_the_supported_range_are_rejected(check_in, check_out):
+    inventory = RoomInventory()
+    with pytest.raises(ValueError):
+        inventory.is_available("Hotel Gopal", check_in, check_out)
+    with pytest.raises(ValueError):
+        inventory.reserve("Hotel Gopal", check_in, check_out)
+    assert inventory.booked_nights == {}
+
+def test_availability_filter():
+    inventory = RoomInventory()
+    inventory.reserve("Hotel Gopal", "2030-05-20", "2030-05-25")
+    available = inventory.availability_filter("2030-05-22", "2030-05-23")
+    assert not available({"hotel_name": "Hotel Gopal"})
+    assert available({"hotel_name": "Hotel Damji"})
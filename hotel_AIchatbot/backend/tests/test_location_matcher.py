@@ -0,0 +1,25 @@
+from helper.location_matcher import LocationMatcher
+
+def test_matches_whole_words_only():
+    matcher = LocationMatcher(["pune", "surat"])
+    assert matcher.find("a hotel in Pune please") == "pune"
+    assert matcher.find("reassurate me") is None
+    assert matcher.find("punerific") is None
+
+def test_prefers_the_longer_of_overlapping_keywords():
+    matcher = LocationMatcher(["uttar pradesh", "uttar"])
+    assert matcher.find("somewhere in Uttar Pradesh") == "uttar pradesh"
+
+def test_no_keywords_never_match():
+    assert LocationMatcher([]).find("anything at all") is None
+
+def test_prefers_a_city_over_its_state():
+    matcher = LocationMatcher(["dwarka", "gujarat", "jaipur", "rajasthan"], {"dwarka": {"gujarat"}, "jaipur": {"rajasthan"}})
+    assert matcher.find("hotel in Dwarka, Gujarat from May 20 to May 25") == "dwarka"
+    assert matcher.find("somewhere in Gujarat, maybe Dwarka") == "dwarka"
+    assert matcher.find("Jaipur, Rajasthan") == "jaipur"
+
+def test_unrelated_locations_keep_the_first():
+    matcher = LocationMatcher(["dwarka", "gujarat", "jaipur", "rajasthan"], {"dwarka": {"gujarat"}, "jaipur": {"rajasthan"}})
+    assert matcher.find("Jaipur or Dwarka") == "jaipur"
+    assert matcher.find("Gujarat or Rajasthan") == "gujarat"
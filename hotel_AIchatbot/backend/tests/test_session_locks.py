@@ -0,0 +1,47 @@
+import gc
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+def fire(client, requests):
+    """Send (session id, message) pairs all at once from a thread pool; returns the responses"""
+    with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+        return list(pool.map(lambda request: client.post(f"/chat/{request[0]}", json={"message": request[1]}), requests))
+
+def test_concurrent_messages_to_one_session_are_serialized(app_factory):
+    from fastapi.testclient import TestClient
+    main = app_factory(latency=0.01)
+    with TestClient(main.app) as client:
+        responses = fire(client, [("s1", f"hello {index}") for index in range(30)])
+        assert all(response.status_code == 200 for response in responses)
+
+        # Every user message is directly followed by its own reply
+        history = main.session_manager.sessions["s1"].history
+        assert len(history) == 60
+        assert [role for role, _ in history] == ["user", "assistant"] * 30
+        assert main.session_manager.get_stats()["lock_waits"] > 0
+
+def test_concurrent_guest_names_are_all_recorded(client, app):
+    for message in ["I need a hotel in Dwarka from 2030-05-20 to 2030-05-25", "Hotel Gopal", "2030-05-20", "2030-05-25", "3"]:
+        client.post("/chat/s1", json={"message": message})
+
+    fire(client, [("s1", name) for name in ["Ann", "Bob", "Cid"]])
+    session = app.session_manager.sessions["s1"]
+    assert sorted(session.guest_names) == ["Ann", "Bob", "Cid"]
+    assert session.current_step == "phone"
+
+def test_sessions_proceed_in_parallel(app_factory):
+    from fastapi.testclient import TestClient
+    latency = 0.2
+    main = app_factory(latency=latency)
+    with TestClient(main.app) as client:
+        start = time.perf_counter()
+        responses = fire(client, [(f"s{index}", "hello") for index in range(10)])
+        elapsed = time.perf_counter() - start
+    assert all(response.status_code == 200 for response in responses)
+    # Serialized across sessions this would take ten LLM round-trips
+    assert elapsed < latency * 5
+
+def test_idle_locks_are_released(client, app):
+    fire(client, [(f"s{index % 5}", "hello") for index in range(20)])
+    gc.collect()
+    assert len(app.session_manager.session_locks) == 0
@@ -0,0 +1,102 @@
+import asyncio
+from helper.session_manager import SessionManager
+from helper.session_snapshot import SessionSnapshotter
+
+def make_manager(tmp_path):
+    config = {"session_snapshot_path": str(tmp_path / "sessions.snapshot"), "session_snapshot_compact_bytes": 1 << 20}
+    manager = SessionManager(config)
+    snapshotter = SessionSnapshotter(manager, config)
+    snapshotter.restore()
+    return manager, snapshotter
+
+def test_sessions_survive_a_restart(tmp_path):
+    manager, snapshotter = make_manager(tmp_path)
+    manager.add_message("s1", "user", "hotel in Dwarka")
+    manager.update_session_data("s1", "current_step", "check_out")
+    manager.update_session_data("s1", "check_in", "2030-05-20")
+    manager.add_message("s2", "user", "hello")
+    asyncio.run(snapshotter.stop())
+
+    manager, snapshotter = make_manager(tmp_path)
+    assert snapshotter.restored == 2
+    session = manager.sessions["s1"]
+    assert session.history == [("user", "hotel in Dwarka")]
+    assert session.current_step == "check_out" and session.check_in == "2030-05-20"
+    assert manager.get_stats()["approx_bytes"] == len("hotel in Dwarka") + len("hello")
+
+def test_dropped_sessions_stay_dropped(tmp_path):
+    manager, snapshotter = make_manager(tmp_path)
+    manager.add_message("s1", "user", "hello")
+    manager.add_message("s2", "user", "hello")
+    asyncio.run(snapshotter.snapshot())
+    manager.drop_session("s1")
+    asyncio.run(snapshotter.stop())
+
+    manager, _ = make_manager(tmp_path)
+    assert list(manager.sessions) == ["s2"]
+
+def test_compaction_keeps_the_latest_state(tmp_path):
+    config = {"session_snapshot_path": str(tmp_path / "sessions.snapshot"), "session_snapshot_compact_bytes": 1}
+    manager = SessionManager(config)
+    snapshotter = SessionSnapshotter(manager, config)
+    snapshotter.restore()
+    for step in ["check_in", "check_out", "num_guests"]:
+        manager.update_session_data("s1", "current_step", step)
+        asyncio.run(snapshotter.snapshot())
+    asyncio.run(snapshotter.stop())
+    assert snapshotter.compactions >= 1
+
+    manager, _ = make_manager(tmp_path)
+    assert manager.sessions["s1"].current_step == "num_guests"
+
+def test_torn_tail_is_ignored(tmp_path):
+    manager, snapshotter = make_manager(tmp_path)
+    manager.add_message("s1", "user", "hello")
+    asyncio.run(snapshotter.stop())
+    with open(snapshotter.delta_path, "ab") as f:
+        f.write(b"\xff\x00\x00")
+
+    manager, _ = make_manager(tmp_path)
+    assert list(manager.sessions) == ["s1"]
+
+def test_corrupt_records_are_skipped(tmp_path):
+    from helper.session_snapshot import RECORD_HEADER
+    manager, snapshotter = make_manager(tmp_path)
+    manager.add_message("s1", "user", "hello")
+    asyncio.run(snapshotter.snapshot())
+    with open(snapshotter.delta_path, "ab") as f:
+        for payload in [b"\x00garbage", b'["s2"]', b'["s3", [1, 2]]']:
+            f.write(RECORD_HEADER.pack(len(payload)) + payload)
+    manager.add_message("s4", "user", "hi")
+    asyncio.run(snapshotter.stop())
+
+    manager, _ = make_manager(tmp_path)
+    assert sorted(manager.sessions) == ["s1", "s4"]
+
+def test_files_in_another_format_are_set_aside(tmp_path):
+    import marshal
+    path = tmp_path / "sessions.snapshot.delta"
+    payload = marshal.dumps(("s1", None))
+    path.write_bytes(len(payload).to_bytes(4, "little") + payload)
+
+    manager, snapshotter = make_manager(tmp_path)
+    assert snapshotter.restored == 0
+    assert (tmp_path / "sessions.snapshot.delta.unreadable").exists()
+    manager.add_message("s2", "user", "hello")
+    asyncio.run(snapshotter.stop())
+
+    manager, _ = make_manager(tmp_path)
+    assert list(manager.sessions) == ["s2"]
+
+def test_reset_last_message_is_snapshotted(tmp_path):
+    manager, snapshotter = make_manager(tmp_path)
+    manager.add_message("s1", "user", "hello")
+    manager.add_message("s1", "assistant", "hi")
+    manager.add_message("s1", "user", "oops")
+    manager.add_message("s1", "assistant", "what?")
+    asyncio.run(snapshotter.snapshot())
+    manager.reset_last_message("s1")
+    asyncio.run(snapshotter.stop())
+
+    manager, _ = make_manager(tmp_path)
+    assert manager.sessions["s1"].history == [("user", "hello"), ("assistant", "hi")]
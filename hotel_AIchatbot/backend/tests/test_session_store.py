@@ -0,0 +1,24 @@
+from fastapi.testclient import TestClient
+from helper.session_store import SQLiteSessionStore, get_session_store
+
+def test_sqlite_store_round_trips_and_expires(tmp_path):
+    store = get_session_store({"session_backend": "sqlite", "session_db_path": str(tmp_path / "sessions.db")})
+    assert isinstance(store, SQLiteSessionStore)
+    store.save("s1", [("user", "hello")], {"current_step": "initial", "guest_names": ["Ann"]})
+    assert store.load("s1") == ([["user", "hello"]], {"current_step": "initial", "guest_names": ["Ann"]})
+    assert store.load("s2") is None
+    assert store.delete_expired(float("inf")) == 1
+    assert store.load("s1") is None
+
+def test_sqlite_sessions_survive_a_restart(app_factory):
+    main = app_factory(session_backend="sqlite")
+    assert not main.session_snapshotter.enabled
+    with TestClient(main.app) as client:
+        for message in ["I need a hotel in Dwarka from 2030-05-20 to 2030-05-25", "Hotel Gopal", "2030-05-20"]:
+            client.post("/chat/s1", json={"message": message})
+
+    main = app_factory(session_backend="sqlite")
+    with TestClient(main.app) as client:
+        response = client.post("/chat/s1", json={"message": "2030-05-25"}).json()
+    assert response["step"] == "num_guests"
+    assert len(main.session_manager.sessions["s1"].history) == 8